@@ -56,6 +56,7 @@ import logging
 from dxchange.exchange import *
 from dxchange.reader import *
 from dxchange.writer import *
+from dxchange.catalog import *
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# #########################################################################
+# Copyright (c) 2015, UChicago Argonne, LLC. All rights reserved.         #
+#                                                                         #
+# Copyright 2015. UChicago Argonne, LLC. This software was produced       #
+# under U.S. Government contract DE-AC02-06CH11357 for Argonne National   #
+# Laboratory (ANL), which is operated by UChicago Argonne, LLC for the    #
+# U.S. Department of Energy. The U.S. Government has rights to use,       #
+# reproduce, and distribute this software.  NEITHER THE GOVERNMENT NOR    #
+# UChicago Argonne, LLC MAKES ANY WARRANTY, EXPRESS OR IMPLIED, OR        #
+# ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  If software is     #
+# modified to produce derivative works, such modified software should     #
+# be clearly marked, so as not to confuse it with the version available   #
+# from ANL.                                                               #
+#                                                                         #
+# Additionally, redistribution and use in source and binary forms, with   #
+# or without modification, are permitted provided that the following      #
+# conditions are met:                                                     #
+#                                                                         #
+#     * Redistributions of source code must retain the above copyright    #
+#       notice, this list of conditions and the following disclaimer.     #
+#                                                                         #
+#     * Redistributions in binary form must reproduce the above copyright #
+#       notice, this list of conditions and the following disclaimer in   #
+#       the documentation and/or other materials provided with the        #
+#       distribution.                                                     #
+#                                                                         #
+#     * Neither the name of UChicago Argonne, LLC, Argonne National       #
+#       Laboratory, ANL, the U.S. Government, nor the names of its        #
+#       contributors may be used to endorse or promote products derived   #
+#       from this software without specific prior written permission.     #
+#                                                                         #
+# THIS SOFTWARE IS PROVIDED BY UChicago Argonne, LLC AND CONTRIBUTORS     #
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT       #
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS       #
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL UChicago     #
+# Argonne, LLC OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,        #
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,    #
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;        #
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER        #
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT      #
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN       #
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE         #
+# POSSIBILITY OF SUCH DAMAGE.                                             #
+# #########################################################################
+
+
+"""
+Module for cataloging the meta data of a tree of hdf files.
+"""
+
+import fnmatch
+import json
+import logging
+import multiprocessing
+import numbers
+import os
+import sqlite3
+
+import numpy as np
+
+import dxchange.reader as dxreader
+
+__author__ = "Doga Gursoy, Francesco De Carlo"
+__copyright__ = "Copyright (c) 2015-2016, UChicago Argonne, LLC."
+__version__ = "0.1.0"
+__docformat__ = "restructuredtext en"
+__all__ = ["MetadataCatalog"]
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    file_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    number REAL,
+    text TEXT,
+    units TEXT
+);
+CREATE INDEX IF NOT EXISTS meta_file ON meta (file_id);
+CREATE INDEX IF NOT EXISTS meta_number ON meta (key, number);
+CREATE INDEX IF NOT EXISTS meta_text ON meta (key, text);
+"""
+
+_OPERATORS = ("==", "!=", "<", "<=", ">", ">=")
+
+
+class MetadataCatalog(object):
+    """
+    SQLite catalog of the meta data of the hdf files in a directory tree.
+
+    Each file is stored with the meta data read by Hdf5MetadataReader, keyed
+    by dataset path (e.g. '/measurement/instrument/monochromator/energy'),
+    and with the standard meta data of create_standard_meta, keyed by name
+    (e.g. 'energy'). Queries only use the database.
+
+    Parameters
+    ----------
+    database : str
+        Path of the SQLite database, created if it does not exist.
+    file_format : str, optional
+        Hdf layout giving the standard meta data, see create_standard_meta.
+        Layouts added with register_meta_layout must be registered before
+        the catalog is created.
+    max_elements : int, optional
+        Datasets with more elements are only summarized, see read_hdf_meta.
+    """
+
+    def __init__(self, database, file_format="dx", max_elements=10000):
+        if file_format not in dxreader._meta_layouts:
+            raise ValueError("Unknown hdf file layout: %s" % file_format)
+        self.database = database
+        self.file_format = file_format
+        # resolved here, worker processes do not see registered layouts
+        self.layout = dict(dxreader._meta_layouts[file_format])
+        self.max_elements = max_elements
+        self.connection = sqlite3.connect(database)
+        self.connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def scan(self, root, pattern="*.h5", workers=None):
+        """
+        Add the files under root to the catalog.
+
+        Only new files and files whose size or modification time changed
+        are read, and files no longer present are removed.
+
+        Parameters
+        ----------
+        root : str
+            Top directory of the tree.
+        pattern : str, optional
+            Shell pattern of the file names to catalog.
+        workers : int, optional
+            Number of processes reading the files.
+
+        Returns
+        -------
+        int
+            Number of files read.
+        """
+        root = os.path.abspath(root)
+        found = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            for name in fnmatch.filter(filenames, pattern):
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found[path] = (st.st_size, st.st_mtime_ns)
+
+        prefix = os.path.join(root, "")
+        known = {
+            path: (size, mtime)
+            for path, size, mtime in self.connection.execute(
+                "SELECT path, size, mtime FROM files WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+        }
+        removed = [path for path in known if path not in found]
+        todo = [
+            (path, stamp, self.layout, self.max_elements)
+            for path, stamp in sorted(found.items())
+            if known.get(path) != stamp
+        ]
+
+        with self.connection:
+            for path in removed:
+                self._delete(path)
+        if workers == 1 or len(todo) < 2:
+            self._store(map(_scan_file, todo))
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                self._store(pool.imap_unordered(_scan_file, todo, chunksize=8))
+        logger.info(
+            "Catalog %s: %d files read, %d removed under %s",
+            self.database, len(todo), len(removed), root,
+        )
+        return len(todo)
+
+    def query(self, *conditions):
+        """
+        Find the files whose meta data match all conditions.
+
+        Parameters
+        ----------
+        conditions : tuple
+            (key, operator, value) with operator one of '==', '!=', '<',
+            '<=', '>', '>='. Numbers are compared numerically, other values
+            as text, so ISO dates compare chronologically.
+
+        Returns
+        -------
+        list of str
+            Sorted paths of the matching files.
+
+        Examples
+        --------
+        >>> catalog.query(('energy', '==', 25), ('end_time', '>', '2023-01-01'))
+        """
+        sql = "SELECT path FROM files"
+        clauses, params = [], []
+        for key, op, value in conditions:
+            if op not in _OPERATORS:
+                raise ValueError("Unsupported operator: %s" % op)
+            column = "number" if _is_number(value) else "text"
+            clauses.append(
+                "id IN (SELECT file_id FROM meta WHERE key = ? AND %s %s ?)"
+                % (column, "=" if op == "==" else op)
+            )
+            params.extend((key, float(value) if column == "number" else str(value)))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return [row[0] for row in self.connection.execute(sql + " ORDER BY path", params)]
+
+    def get(self, path):
+        """
+        Return the cataloged meta data of a file.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file.
+
+        Returns
+        -------
+        dict
+            Dictionary with dict[key] = [value, units].
+        """
+        rows = self.connection.execute(
+            "SELECT key, number, text, units FROM meta JOIN files ON files.id = file_id "
+            "WHERE path = ?",
+            (os.path.abspath(path),),
+        )
+        return {
+            key: [number if text is None else text, units]
+            for key, number, text, units in rows
+        }
+
+    def _delete(self, path):
+        row = self.connection.execute(
+            "SELECT id FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None:
+            self.connection.execute("DELETE FROM meta WHERE file_id = ?", row)
+            self.connection.execute("DELETE FROM files WHERE id = ?", row)
+
+    def _store(self, results):
+        with self.connection:
+            for path, (size, mtime), meta, error in results:
+                if error is not None:
+                    logger.warning("Cannot catalog %s: %s", path, error)
+                self._delete(path)
+                file_id = self.connection.execute(
+                    "INSERT INTO files (path, size, mtime, error) VALUES (?, ?, ?, ?)",
+                    (path, size, mtime, error),
+                ).lastrowid
+                self.connection.executemany(
+                    "INSERT INTO meta (file_id, key, number, text, units) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(file_id, key, number, text, units)
+                     for key, (number, text, units) in meta.items()],
+                )
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _flatten_value(value):
+    """
+    Return the (number, text) database columns of a meta data value.
+    """
+    if isinstance(value, np.ndarray) and value.size == 1:
+        value = value.flat[0]
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", "replace")
+    if _is_number(value) and not isinstance(value, complex):
+        return float(value), None
+    if isinstance(value, np.ndarray):
+        return None, json.dumps(value.tolist(), default=str)
+    return None, str(value)
+
+
+def _scan_file(args):
+    """
+    Read the meta data of one file for the catalog.
+    """
+    path, stamp, layout, max_elements = args
+    try:
+        reader = dxreader.Hdf5MetadataReader(
+            path, readOnOpen=False, maxElements=max_elements)
+        try:
+            meta = reader.readMetadata()
+        finally:
+            reader.close()
+        # the standard meta data are among the datasets already read
+        for key, dpath in layout.items():
+            if dpath in meta:
+                meta[key] = meta[dpath]
+        meta = {
+            key: _flatten_value(value) + (units,)
+            for key, (value, units) in meta.items()
+        }
+        return path, stamp, meta, None
+    except Exception as e:
+        return path, stamp, {}, str(e)
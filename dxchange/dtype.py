@@ -147,10 +147,8 @@ def as_sharedmem(arr, copy=False):
     # first check to see if it already a shared array
     if not copy and is_sharedmem(arr):
         return arr
-    # get ctype from numpy array
-    ctype = np.ctypeslib._typecodes[arr.__array_interface__['typestr']]
     # create shared ctypes object with no lock
-    shared_obj = mp.RawArray(ctype, arr.size)
+    shared_obj = mp.RawArray(ctypes.c_byte, arr.nbytes)
     # create numpy array from shared object
     #shared_arr = np.ctypeslib.as_array(shared_obj)
     shared_arr = np.frombuffer(shared_obj, dtype=arr.dtype)
@@ -180,14 +178,13 @@ def is_contiguous(arr):
 
 def empty_shared_array(shape, dtype=np.float32):
     # create a shared ndarray with the provided shape and type
-    # get ctype from np dtype
-    temp_arr = np.empty((1), dtype)
-    ctype = np.ctypeslib._typecodes[temp_arr.__array_interface__['typestr']]
-    # create shared ctypes object with no lock
+    dtype = np.dtype(dtype)
     size = 1
     for dim in shape:
         size *= dim
-    shared_obj = mp.RawArray(ctype, size)
+    # create shared ctypes object with no lock, sized in bytes so that any
+    # numpy dtype can be viewed on it
+    shared_obj = mp.RawArray(ctypes.c_byte, size * dtype.itemsize)
     # create numpy array from shared object
     arr = np.frombuffer(shared_obj, dtype)
     arr = arr.reshape(shape)
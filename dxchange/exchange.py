@@ -71,6 +71,7 @@ __all__ = ['read_als_832',
            'read_als_832h5',
            'read_anka_topotomo',
            'read_aps_tomoscan_hdf5',
+           'tail_aps_tomoscan_hdf5',
            'read_aps_1id',
            'read_aps_2bm',
            'read_aps_5bm',
@@ -94,7 +95,8 @@ __all__ = ['read_als_832',
 logger = logging.getLogger(__name__)
 
 
-def read_als_832(fname, ind_tomo=None, normalized=False, proj=None, sino=None):
+def read_als_832(fname, ind_tomo=None, normalized=False, proj=None, sino=None,
+                 workers=None):
     """
     Read ALS 8.3.2 standard data format.
 
@@ -118,6 +120,9 @@ def read_als_832(fname, ind_tomo=None, normalized=False, proj=None, sino=None):
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    workers : int, optional
+        Number of threads used to decode the tiff files.
+
     Returns
     -------
     ndarray
@@ -172,7 +177,7 @@ def read_als_832(fname, ind_tomo=None, normalized=False, proj=None, sino=None):
 
     # Read image data from tiff stack.
     tomo = dxreader.read_tiff_stack(tomo_name, ind=ind_tomo, digit=4,
-                                    slc=(sino, None))
+                                    slc=(sino, None), workers=workers)
 
     if not normalized:
 
@@ -208,7 +213,7 @@ def read_als_832(fname, ind_tomo=None, normalized=False, proj=None, sino=None):
             flat = dxreader._slice_array(flat, (None, sino))
         else:
             flat = dxreader.read_tiff_stack(flat_name, ind=ind_flat, digit=4,
-                                            slc=(sino, None))
+                                            slc=(sino, None), workers=workers)
 
         # Adheres to 8.3.2 flat/dark naming conventions:
         # ----Darks----
@@ -239,7 +244,7 @@ def read_als_832(fname, ind_tomo=None, normalized=False, proj=None, sino=None):
 
 
 def read_als_832h5(fname, ind_tomo=None, ind_flat=None, ind_dark=None,
-                   proj=None, sino=None):
+                   proj=None, sino=None, workers=None):
     """
     Read ALS 8.3.2 hdf5 file with stacked datasets.
 
@@ -264,6 +269,9 @@ def read_als_832h5(fname, ind_tomo=None, ind_flat=None, ind_dark=None,
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    workers : int, optional
+        Number of processes reading compressed datasets in parallel.
+
     Returns
     -------
     ndarray
@@ -321,19 +329,22 @@ def read_als_832h5(fname, ind_tomo=None, ind_flat=None, ind_dark=None,
             group_flat = None
 
         tomo = dxreader.read_hdf5_stack(
-            dgroup, tomo_name, ind_tomo, slc=(None, sino))
+            dgroup, tomo_name, ind_tomo, slc=(None, sino), workers=workers)
 
         flat = dxreader.read_hdf5_stack(
-            dgroup, flat_name, ind_flat, slc=(None, sino), out_ind=group_flat)
+            dgroup, flat_name, ind_flat, slc=(None, sino), out_ind=group_flat,
+            workers=workers)
 
         dark = dxreader.read_hdf5_stack(
-            dgroup, dark_name, ind_dark, slc=(None, sino), out_ind=group_dark)
+            dgroup, dark_name, ind_dark, slc=(None, sino), out_ind=group_dark,
+            workers=workers)
 
     return tomo, flat, dark, dxreader._map_loc(ind_tomo, group_flat)
 
 
 def read_anka_topotomo(
-        fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None):
+        fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None,
+        workers=None):
     """
     Read ANKA TOPO-TOMO standard data format.
 
@@ -357,6 +368,9 @@ def read_anka_topotomo(
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    workers : int, optional
+        Number of threads used to decode the tiff files.
+
     Returns
     -------
     ndarray
@@ -375,15 +389,16 @@ def read_anka_topotomo(
     if proj is not None:
         ind_tomo = ind_tomo[slice(*proj)]
     tomo = dxreader.read_tiff_stack(
-        tomo_name, ind=ind_tomo, slc=(sino, None))
+        tomo_name, ind=ind_tomo, slc=(sino, None), workers=workers)
     flat = dxreader.read_tiff_stack(
-        flat_name, ind=ind_flat, slc=(sino, None))
+        flat_name, ind=ind_flat, slc=(sino, None), workers=workers)
     dark = dxreader.read_tiff_stack(
-        dark_name, ind=ind_dark, slc=(sino, None))
+        dark_name, ind=ind_dark, slc=(sino, None), workers=workers)
     return tomo, flat, dark
 
 
-def read_aps_1id(fname, ind_tomo=None, proj=None, sino=None, layer=0):
+def read_aps_1id(fname, ind_tomo=None, proj=None, sino=None, layer=0,
+                 workers=None):
     """
     Read APS 1-ID standard data format.
 
@@ -404,6 +419,9 @@ def read_aps_1id(fname, ind_tomo=None, proj=None, sino=None, layer=0):
     layer: int, optional
         Specify the layer to reconstruct
 
+    workers : int, optional
+        Number of threads used to decode the tiff files.
+
     Returns
     -------
     ndarray
@@ -451,11 +469,11 @@ def read_aps_1id(fname, ind_tomo=None, proj=None, sino=None, layer=0):
     ind_flat = list(range(flat_start, flat_start + nflat))
     ind_dark = list(range(dark_start, dark_start + ndark))
     tomo = dxreader.read_tiff_stack(
-        _fname, ind=ind_tomo, slc=(sino, None))
+        _fname, ind=ind_tomo, slc=(sino, None), workers=workers)
     flat = dxreader.read_tiff_stack(
-        _fname, ind=ind_flat, slc=(sino, None))
+        _fname, ind=ind_flat, slc=(sino, None), workers=workers)
     dark = dxreader.read_tiff_stack(
-        _fname, ind=ind_dark, slc=(sino, None))
+        _fname, ind=ind_dark, slc=(sino, None), workers=workers)
     return tomo, flat, dark
 
 
@@ -563,8 +581,9 @@ def read_aps_7bm(fname, proj=None, sino=None):
     """
     tomo_grp = '/'.join(['exchange', 'data'])
     theta_grp = '/'.join(['exchange', 'theta'])
-    tomo = dxreader.read_hdf5(fname, tomo_grp, slc=(proj, sino))
-    theta = dxreader.read_hdf5(fname, theta_grp, slc=(proj, ))
+    with dxreader.hdf5_cache():
+        tomo = dxreader.read_hdf5(fname, tomo_grp, slc=(proj, sino))
+        theta = dxreader.read_hdf5(fname, theta_grp, slc=(proj, ))
     return tomo, theta
 
 
@@ -740,7 +759,8 @@ def read_aps_26id(image_directory, ind_tomo, ind_flat,
                         image_file_pattern, flat_file_pattern, proj, sino)
 
 
-def read_aps_32id(fname, exchange_rank=0, proj=None, sino=None, dtype=None):
+def read_aps_32id(fname, exchange_rank=0, proj=None, sino=None, dtype=None,
+                  workers=None, lazy=False):
     """
     Read APS 32-ID standard data format.
 
@@ -766,6 +786,13 @@ def read_aps_32id(fname, exchange_rank=0, proj=None, sino=None, dtype=None):
     dtype : numpy datatype, optional
         Convert data to this datatype on read if specified.
 
+    workers : int, optional
+        Number of processes reading the hdf5 datasets in parallel.
+
+    lazy : bool, optional
+        If True, return the data as dxchange.reader.Hdf5Array objects reading
+        only the indexed regions from the file.
+
     Returns
     -------
     ndarray
@@ -780,10 +807,13 @@ def read_aps_32id(fname, exchange_rank=0, proj=None, sino=None, dtype=None):
     ndarray
         1D theta in radian.
     """
-    return read_aps_tomoscan_hdf5(fname, exchange_rank=exchange_rank, proj=proj, sino=sino)
+    return read_aps_tomoscan_hdf5(fname, exchange_rank=exchange_rank, proj=proj, sino=sino,
+                                  workers=workers, lazy=lazy)
 
 
-def read_aps_tomoscan_hdf5(fname, exchange_rank=0, proj=None, sino=None, dtype=None):
+def read_aps_tomoscan_hdf5(fname, exchange_rank=0, proj=None, sino=None, dtype=None,
+                           workers=None, lazy=False, normalize=False,
+                           minus_log=False):
     """
     Read APS tomoscan HDF5 format.
 
@@ -809,20 +839,55 @@ def read_aps_tomoscan_hdf5(fname, exchange_rank=0, proj=None, sino=None, dtype=N
     dtype : numpy datatype, optional
         Convert data to this datatype on read if specified.
 
+    workers : int, optional
+        Number of processes reading the hdf5 datasets in parallel.
+
+    lazy : bool, optional
+        If True, return the data as dxchange.reader.Hdf5Array objects reading
+        only the indexed regions from the file.
+
+    normalize : {False, True, 'mean', 'median'}, optional
+        If set, reduce the flat and dark fields to their mean (True, 'mean')
+        or median frame and return the projections normalized as
+        (tomo - dark) / (flat - dark) in float32. The projections are read
+        in blocks and normalized in place, without keeping a raw copy. With
+        workers, they are all read as float32 by a single process pool.
+        Cannot be combined with dtype or lazy.
+
+    minus_log : bool, optional
+        If True, also apply -log to the normalized projections.
+
     Returns
     -------
     ndarray
         3D tomographic data.
 
     ndarray
-        3D flat field data.
+        3D flat field data. The reduced frame of shape (1, rows, columns)
+        when normalizing.
 
     ndarray
-        3D dark field data.
+        3D dark field data. The reduced frame of shape (1, rows, columns)
+        when normalizing.
 
     ndarray
         1D theta in radian.
     """
+    field_workers = workers
+    if normalize is not False and normalize is not None:
+        if normalize is not True and normalize not in ('mean', 'median'):
+            raise ValueError("normalize must be True, 'mean' or 'median', "
+                             "not %r" % (normalize, ))
+        if dtype is not None or lazy:
+            raise ValueError('dtype and lazy cannot be used when normalizing')
+        # projections are read as float32 and normalized in place, all at
+        # once by a single process pool if workers are given, otherwise
+        # block by block without keeping a raw copy
+        parallel = workers is not None and workers > 1
+        lazy = not parallel
+        dtype = np.float32 if parallel else None
+        field_workers = None
+
     if exchange_rank > 0:
         exchange_base = 'exchange{:d}'.format(int(exchange_rank))
     else:
@@ -832,49 +897,152 @@ def read_aps_tomoscan_hdf5(fname, exchange_rank=0, proj=None, sino=None, dtype=N
     flat_grp = '/'.join([exchange_base, 'data_white'])
     dark_grp = '/'.join([exchange_base, 'data_dark'])
     theta_grp = '/'.join([exchange_base, 'theta'])
-    tomo = dxreader.read_hdf5(fname, tomo_grp, slc=(proj, sino), dtype=dtype)
-    flat = dxreader.read_hdf5(fname, flat_grp, slc=(None, sino), dtype=dtype)
-    dark = dxreader.read_hdf5(fname, dark_grp, slc=(None, sino), dtype=dtype)
-    theta = dxreader.read_hdf5(fname, theta_grp, slc=None)
-
-    if (flat is None) or ((flat.shape[0]==1) and (flat.max() == 0)):
-        try:
-            # See if flat_field_value is in the file
-            flat_field_value = dxreader.read_hdf5(fname,
-                                                  '/process/acquisition/flat_fields/flat_field_value')[0]
-            flat = tomo[0,:,:] * 0 + flat_field_value
-        except:
-            logger.warn('No flat field data or flat_field_value')
-
-    if (dark is None) or ((dark.shape[0]==1) and (dark.max() == 0)):
-        try:
-            # See if dark_field_value is in the file
-            dark_field_value = dxreader.read_hdf5(fname,
-                                                  '/process/acquisition/dark_fields/dark_field_value')[0]
-            dark = tomo[0,:,:] * 0 + dark_field_value
-        except:
-            logger.warn('No dark field data or dark_field_value')
-
-    if theta is None:
-        try:
-            # See if the rotation start, step, num_angles are in the file
-            rotation_start = dxreader.read_hdf5(fname,
-                                                '/process/acquisition/rotation/rotation_start')[0]
-            rotation_step = dxreader.read_hdf5(fname,
-                                               '/process/acquisition/rotation/rotation_step')[0]
-            num_angles = dxreader.read_hdf5(fname,
-                                            '/process/acquisition/rotation/num_angles')[0]
-            if num_angles != tomo.shape[0]:
-                logger.warn('num_angles(%d) is not the same as tomo.shape[0](%d)', num_angles, tomo.shape[0])
-            theta = rotation_start + rotation_step*range(num_angles)
-        except:
-            theta_size = tomo.shape[0]
-            logger.warn('Generating "%s" [0-180] deg angles for missing "exchange/theta" dataset', str(theta_size))
-            theta = np.linspace(0. , 180, theta_size)
-    theta = np.deg2rad(theta)
+    # the file is opened once for all the datasets read below
+    with dxreader.hdf5_cache():
+        tomo = dxreader.read_hdf5(fname, tomo_grp, slc=(proj, sino), dtype=dtype,
+                                  workers=workers, lazy=lazy)
+        flat = dxreader.read_hdf5(fname, flat_grp, slc=(None, sino), dtype=dtype,
+                                  workers=field_workers, lazy=lazy)
+        dark = dxreader.read_hdf5(fname, dark_grp, slc=(None, sino), dtype=dtype,
+                                  workers=field_workers, lazy=lazy)
+        theta = dxreader.read_hdf5(fname, theta_grp, slc=None)
+
+        if (flat is None) or ((flat.shape[0]==1) and (np.max(flat) == 0)):
+            try:
+                # See if flat_field_value is in the file
+                flat_field_value = dxreader.read_hdf5(fname,
+                                                      '/process/acquisition/flat_fields/flat_field_value')[0]
+                flat = tomo[0,:,:] * 0 + flat_field_value
+            except:
+                logger.warn('No flat field data or flat_field_value')
+
+        if (dark is None) or ((dark.shape[0]==1) and (np.max(dark) == 0)):
+            try:
+                # See if dark_field_value is in the file
+                dark_field_value = dxreader.read_hdf5(fname,
+                                                      '/process/acquisition/dark_fields/dark_field_value')[0]
+                dark = tomo[0,:,:] * 0 + dark_field_value
+            except:
+                logger.warn('No dark field data or dark_field_value')
+
+        if theta is None:
+            try:
+                # See if the rotation start, step, num_angles are in the file
+                rotation_start = dxreader.read_hdf5(fname,
+                                                    '/process/acquisition/rotation/rotation_start')[0]
+                rotation_step = dxreader.read_hdf5(fname,
+                                                   '/process/acquisition/rotation/rotation_step')[0]
+                num_angles = dxreader.read_hdf5(fname,
+                                                '/process/acquisition/rotation/num_angles')[0]
+                if num_angles != tomo.shape[0]:
+                    logger.warn('num_angles(%d) is not the same as tomo.shape[0](%d)', num_angles, tomo.shape[0])
+                theta = rotation_start + rotation_step*range(num_angles)
+            except:
+                theta_size = tomo.shape[0]
+                logger.warn('Generating "%s" [0-180] deg angles for missing "exchange/theta" dataset', str(theta_size))
+                theta = np.linspace(0. , 180, theta_size)
+        theta = np.deg2rad(theta)
+
+        if normalize:
+            if flat is None or dark is None:
+                raise ValueError('Flat and dark fields are required to normalize')
+            method = 'median' if normalize == 'median' else 'mean'
+            flat = _reduce_fields(flat, method)
+            dark = _reduce_fields(dark, method)
+            tomo = _normalize_tomo(tomo, flat[0], dark[0], minus_log)
     return tomo, flat, dark, theta
 
 
+def tail_aps_tomoscan_hdf5(fname, exchange_rank=0, sino=None, dtype=None,
+                           interval=1.0, timeout=None):
+    """
+    Read the projections of an APS tomoscan HDF5 file while it is being
+    acquired, as the writer appends them in SWMR mode.
+
+    Parameters
+    ----------
+    fname : str
+        Path to hdf5 file.
+
+    exchange_rank : int, optional
+        exchange_rank is added to "exchange" to point tomopy to the data
+        to reconstruct, see read_aps_tomoscan_hdf5.
+
+    sino : {sequence, int}, optional
+        Specify sinograms to read. (start, end, step)
+
+    dtype : numpy datatype, optional
+        Convert data to this datatype on read if specified.
+
+    interval : float, optional
+        Time in seconds between polls without new projections.
+
+    timeout : float, optional
+        Stop after this many seconds without new projections. By default
+        only stop once the num_angles projections of the scan are read.
+
+    Yields
+    ------
+    range
+        Indices of the projections read.
+
+    ndarray
+        3D tomographic data of the new projections.
+    """
+    if exchange_rank > 0:
+        exchange_base = 'exchange{:d}'.format(int(exchange_rank))
+    else:
+        exchange_base = "exchange"
+
+    tomo_grp = '/'.join([exchange_base, 'data'])
+    with dxreader.Hdf5TailReader(fname, tomo_grp, slc=(sino, ), dtype=dtype) as tail:
+        total = tail.file.get('/process/acquisition/rotation/num_angles')
+        if total is not None:
+            total = int(np.ravel(total[()])[0])
+        elif timeout is None:
+            logger.warn('No num_angles in %s, reading until interrupted', fname)
+        for block in tail.follow(interval=interval, timeout=timeout, total=total):
+            yield block
+
+
+def _reduce_fields(arr, method):
+    """
+    Reduce a stack of flat or dark fields to one float32 frame.
+    """
+    arr = np.asarray(arr)
+    arr = arr.reshape((-1, ) + arr.shape[-2:])
+    if method == 'median':
+        frame = np.median(arr, axis=0)
+    else:
+        frame = np.mean(arr, axis=0, dtype=np.float64)
+    return frame.astype(np.float32)[np.newaxis]
+
+
+def _normalize_tomo(tomo, flat, dark, minus_log, block_bytes=2**26):
+    """
+    Read projections block by block into a float32 array and normalize
+    them in place with the reduced flat and dark frames. Projections
+    already read as a float32 array are normalized in place.
+    """
+    if isinstance(tomo, np.ndarray) and tomo.dtype == np.float32:
+        out = tomo
+    else:
+        out = np.empty(tomo.shape, dtype=np.float32)
+    denom = flat - dark
+    denom[denom < 1e-6] = 1e-6
+    step = max(1, block_bytes // max(1, out[0].nbytes))
+    for s0 in range(0, out.shape[0], step):
+        block = out[s0:s0 + step]
+        if out is not tomo:
+            block[...] = tomo[s0:s0 + step]
+        block -= dark
+        block /= denom
+        if minus_log:
+            np.log(block, out=block)
+            np.negative(block, out=block)
+    return out
+
+
 def read_nexus(fname, 
                proj=None, 
                sino=None, 
@@ -949,7 +1117,8 @@ def read_nexus(fname,
     return tomo, flat, dark, theta
 
 
-def read_aus_microct(fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None):
+def read_aus_microct(fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None,
+                     workers=None):
     """
     Read Australian Synchrotron micro-CT standard data format.
 
@@ -973,6 +1142,9 @@ def read_aus_microct(fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None):
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    workers : int, optional
+        Number of threads used to decode the tiff files.
+
     Returns
     -------
     ndarray
@@ -992,11 +1164,11 @@ def read_aus_microct(fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None):
     if proj is not None:
         ind_tomo = ind_tomo[slice(*proj)]
     tomo = dxreader.read_tiff_stack(
-        tomo_name, ind=ind_tomo, slc=(sino, None))
+        tomo_name, ind=ind_tomo, slc=(sino, None), workers=workers)
     flat = dxreader.read_tiff_stack(
-        flat_name, ind=ind_flat, slc=(sino, None))
+        flat_name, ind=ind_flat, slc=(sino, None), workers=workers)
     dark = dxreader.read_tiff_stack(
-        dark_name, ind=ind_dark, slc=(sino, None))
+        dark_name, ind=ind_dark, slc=(sino, None), workers=workers)
     return tomo, flat, dark
 
 
@@ -1072,7 +1244,8 @@ def read_diamond_l12(fname, ind_tomo, proj=None):
 
 
 def read_elettra_syrmep(
-        fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None):
+        fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None,
+        workers=None):
     """
     Read Elettra SYRMEP standard data format.
 
@@ -1096,6 +1269,9 @@ def read_elettra_syrmep(
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    workers : int, optional
+        Number of threads used to decode the tiff files.
+
     Returns
     -------
     ndarray
@@ -1114,15 +1290,15 @@ def read_elettra_syrmep(
     if proj is not None:
         ind_tomo = ind_tomo[slice(*proj)]
     tomo = dxreader.read_tiff_stack(
-        tomo_name, ind=ind_tomo, slc=(sino, None))
+        tomo_name, ind=ind_tomo, slc=(sino, None), workers=workers)
     flat = dxreader.read_tiff_stack(
-        flat_name, ind=ind_flat, slc=(sino, None))
+        flat_name, ind=ind_flat, slc=(sino, None), workers=workers)
     dark = dxreader.read_tiff_stack(
-        dark_name, ind=ind_dark, slc=(sino, None))
+        dark_name, ind=ind_dark, slc=(sino, None), workers=workers)
     return tomo, flat, dark
 
 
-def read_lnls_imx(folder, proj=None, sino=None):
+def read_lnls_imx(folder, proj=None, sino=None, workers=None, lazy=False):
     """
     Read LNLS IMX standard data format.
 
@@ -1137,6 +1313,13 @@ def read_lnls_imx(folder, proj=None, sino=None):
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    workers : int, optional
+        Number of processes reading the hdf5 datasets in parallel.
+
+    lazy : bool, optional
+        If True, return the data as dxchange.reader.Hdf5Array objects reading
+        only the indexed regions from the file.
+
     Returns
     -------
     ndarray
@@ -1152,13 +1335,16 @@ def read_lnls_imx(folder, proj=None, sino=None):
     tomo_name = os.path.join(folder, 'tomo.h5')
     flat_name = os.path.join(folder, 'tomo_flat_before.h5')
     dark_name = os.path.join(folder, 'tomo_dark_before.h5')
-    tomo = dxreader.read_hdf5(tomo_name, 'images', slc=(proj, sino))
-    flat = dxreader.read_hdf5(flat_name, 'flats', slc=(None, sino))
-    dark = dxreader.read_hdf5(dark_name, 'darks', slc=(None, sino))
+    tomo = dxreader.read_hdf5(tomo_name, 'images', slc=(proj, sino),
+                              workers=workers, lazy=lazy)
+    flat = dxreader.read_hdf5(flat_name, 'flats', slc=(None, sino),
+                              workers=workers, lazy=lazy)
+    dark = dxreader.read_hdf5(dark_name, 'darks', slc=(None, sino),
+                              workers=workers, lazy=lazy)
     return tomo, flat, dark
 
 
-def read_nsls2_fxi18_h5(fname, proj=None, sino=None):
+def read_nsls2_fxi18_h5(fname, proj=None, sino=None, lazy=False):
     """
     Read LNLS IMX standard data format.
 
@@ -1173,6 +1359,10 @@ def read_nsls2_fxi18_h5(fname, proj=None, sino=None):
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    lazy : bool, optional
+        If True, return the data as dxchange.reader.Hdf5Array objects reading
+        only the indexed regions from the file.
+
     Returns
     -------
     ndarray
@@ -1188,16 +1378,18 @@ def read_nsls2_fxi18_h5(fname, proj=None, sino=None):
         1D theta in radian.
 
     """
-    tomo = dxreader.read_hdf5(fname, 'img_tomo', slc=(proj, sino))
-    flats = dxreader.read_hdf5(fname, 'img_bkg', slc=(None, sino))
-    darks = dxreader.read_hdf5(fname, 'img_dark', slc=(None, sino))
-    theta = dxreader.read_hdf5(fname, 'angle', slc=(proj,))
+    with dxreader.hdf5_cache():
+        tomo = dxreader.read_hdf5(fname, 'img_tomo', slc=(proj, sino), lazy=lazy)
+        flats = dxreader.read_hdf5(fname, 'img_bkg', slc=(None, sino), lazy=lazy)
+        darks = dxreader.read_hdf5(fname, 'img_dark', slc=(None, sino), lazy=lazy)
+        theta = dxreader.read_hdf5(fname, 'angle', slc=(proj,))
     theta = np.deg2rad(theta)
     return tomo, flats, darks, theta
 
 
 def read_petraIII_p05(
-        fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None):
+        fname, ind_tomo, ind_flat, ind_dark, proj=None, sino=None,
+        workers=None):
     """
     Read Petra-III P05 standard data format.
 
@@ -1221,6 +1413,9 @@ def read_petraIII_p05(
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    workers : int, optional
+        Number of threads used to decode the tiff files.
+
     Returns
     -------
     ndarray
@@ -1242,15 +1437,15 @@ def read_petraIII_p05(
     if proj is not None:
         ind_tomo = ind_tomo[slice(*proj)]
     tomo = dxreader.read_tiff_stack(
-        tomo_name, ind=ind_tomo, slc=(sino, None))
+        tomo_name, ind=ind_tomo, slc=(sino, None), workers=workers)
     flat = dxreader.read_tiff_stack(
-        flat_name, ind=ind_flat, slc=(sino, None))
+        flat_name, ind=ind_flat, slc=(sino, None), workers=workers)
     dark = dxreader.read_tiff_stack(
-        dark_name, ind=ind_dark, slc=(sino, None))
+        dark_name, ind=ind_dark, slc=(sino, None), workers=workers)
     return tomo, flat, dark
 
 
-def read_sls_tomcat(fname, ind_tomo=None, proj=None, sino=None):
+def read_sls_tomcat(fname, ind_tomo=None, proj=None, sino=None, workers=None):
     """
     Read SLS TOMCAT standard data format.
 
@@ -1268,6 +1463,9 @@ def read_sls_tomcat(fname, ind_tomo=None, proj=None, sino=None):
     sino : {sequence, int}, optional
         Specify sinograms to read. (start, end, step)
 
+    workers : int, optional
+        Number of threads used to decode the tiff files.
+
     Returns
     -------
     ndarray
@@ -1311,11 +1509,11 @@ def read_sls_tomcat(fname, ind_tomo=None, proj=None, sino=None):
     ind_flat = list(range(flat_start, flat_end))
     ind_dark = list(range(dark_start, dark_end))
     tomo = dxreader.read_tiff_stack(
-        _fname, ind=ind_tomo, slc=(sino, None))
+        _fname, ind=ind_tomo, slc=(sino, None), workers=workers)
     flat = dxreader.read_tiff_stack(
-        _fname, ind=ind_flat, slc=(sino, None))
+        _fname, ind=ind_flat, slc=(sino, None), workers=workers)
     dark = dxreader.read_tiff_stack(
-        _fname, ind=ind_dark, slc=(sino, None))
+        _fname, ind=ind_dark, slc=(sino, None), workers=workers)
 
     return tomo, flat, dark
 
@@ -1362,7 +1560,8 @@ def read_sesame_beats(fname, exchange_rank=0, proj=None, sino=None, dtype=None):
     """
 
     # read projections, darks, flats and angles
-    projs, flats, darks, _ = read_aps_32id(fname, exchange_rank=0, proj=proj, sino=sino)
-    theta = np.radians(dxreader.read_hdf5(fname, 'exchange/theta', slc=(proj,)))
+    with dxreader.hdf5_cache():
+        projs, flats, darks, _ = read_aps_32id(fname, exchange_rank=0, proj=proj, sino=sino)
+        theta = np.radians(dxreader.read_hdf5(fname, 'exchange/theta', slc=(proj,)))
 
     return projs, flats, darks, theta
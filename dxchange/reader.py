@@ -56,39 +56,52 @@ import h5py
 import logging
 import re
 import math
+import operator
+import time
 import struct
+import threading
+import multiprocessing
 from contextlib import contextmanager
 import dxchange.writer as writer
-from dxchange.dtype import empty_shared_array
+from dxchange.dtype import empty_shared_array, is_sharedmem
 import warnings
-import functools
 import tifffile
-import scipy.misc as sm
 import pandas as pd
 from itertools import cycle
 from io import StringIO
-from collections import deque
-from scipy.ndimage import median_filter, rotate
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from scipy.ndimage import map_coordinates, median_filter, rotate
+from scipy.special import cosdg, sindg
 
 __author__ = "Doga Gursoy, Francesco De Carlo"
 __copyright__ = "Copyright (c) 2015-2016, UChicago Argonne, LLC."
 __version__ = "0.1.0"
 __docformat__ = 'restructuredtext en'
 __all__ = ['read_hdf_meta',
+           'read_hdf_meta_paths',
+           'register_meta_layout',
            'read_edf',
            'read_hdf5',
+           'Hdf5Array',
+           'Hdf5TailReader',
            'read_netcdf4',
            'read_npy',
            'read_spe',
            'read_fits',
            'read_tiff',
            'read_tiff_stack',
+           'iter_tiff_stack',
+           'read_tiff_pages',
            'read_xrm',
            'read_xrm_stack',
            'read_aps_1id_metafile',
            'read_txrm',
            'read_hdf5_stack',
-           'read_file_list']
+           'read_file_list',
+           'clear_hdf5_cache',
+           'set_hdf5_cache_size',
+           'hdf5_cache']
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +136,7 @@ def _check_read(fname):
     return os.path.abspath(fname)
 
 
-def read_tiff(fname, slc=None, angle=None, mblur=None):
+def read_tiff(fname, slc=None, angle=None, mblur=None, out=None):
     """
     Read data from tiff file.
 
@@ -138,6 +151,9 @@ def read_tiff(fname, slc=None, angle=None, mblur=None):
     angle : angle in degree(+ ccw), optional
         angle of rotation after open the image.
     mblur : size of median filter (should be positive integer >= 3)
+    out : ndarray, optional
+        Array receiving the image, with the shape of the output. When it
+        also matches the data type, the image is decoded straight into it.
 
     Returns
     -------
@@ -146,11 +162,24 @@ def read_tiff(fname, slc=None, angle=None, mblur=None):
     """
     fname = _check_read(fname)
     try:
-        _arr = tifffile.imread(fname, out='memmap')
+        with tifffile.TiffFile(fname) as tif:
+            page = tif.pages[0]
+            arr = None
+            if mblur is None and not angle and len(tif.pages) == 1:
+                if slc is not None:
+                    # compressed files: decode only the strips/tiles in slc
+                    arr = _read_tiff_segments(page, slc, out)
+                elif (out is not None and out.shape == page.shape and
+                        out.dtype == page.dtype and out.flags.c_contiguous):
+                    arr = tif.asarray(out=out)
+            if arr is not None:
+                _log_imported_data(fname, arr)
+                return arr
+            _arr = tif.asarray(out='memmap')
     except IOError:
         logger.error('No such file or directory: %s', fname)
         return False
-        
+
     if (mblur is not None):
         _arr = median_filter(_arr, mblur)
         # bilateral Filter takes only u8/f32
@@ -164,11 +193,217 @@ def read_tiff(fname, slc=None, angle=None, mblur=None):
         # slice it
         arr = _slice_array(arr, slc)
 
+    if out is not None:
+        out[...] = arr
+        arr = out
+    _log_imported_data(fname, arr)
+    return arr
+
+
+def _read_tiff_segments(page, slc, out=None):
+    """
+    Decode only the strips or tiles of a tiff page that cover the rows and
+    columns selected by slc, into out if given.
+
+    Returns None when the page should rather be read in full: uncompressed
+    contiguous data (memory-mapped instead), multi-sample or volumetric
+    pages.
+    """
+    key = page.keyframe
+    if page.is_contiguous or key.shaped[:2] != (1, 1) or key.shaped[4] != 1:
+        return None
+    length, width = key.shaped[2:4]
+    slc = _make_slice_object_a_tuple(slc or ()) + (slice(None), ) * 2
+    rows = range(*slc[0].indices(length))
+    cols = range(*slc[1].indices(width))
+    if len(rows) == 0 or len(cols) == 0:
+        return None
+    row0, row1 = min(rows), max(rows) + 1
+    col0, col1 = min(cols), max(cols) + 1
+
+    if key.is_tiled:
+        tl, tw = key.tilelength, key.tilewidth
+        ntiles = -(-width // tw)
+        index = [ty * ntiles + tx
+                 for ty in range(row0 // tl, (row1 - 1) // tl + 1)
+                 for tx in range(col0 // tw, (col1 - 1) // tw + 1)]
+    else:
+        rps = min(key.rowsperstrip, length)
+        index = range(row0 // rps, (row1 - 1) // rps + 1)
+
+    decodeargs = {}
+    if key.compression in (6, 7, 33007, 34892):  # JPEG
+        decodeargs['jpegtables'] = key.jpegtables
+        decodeargs['jpegheader'] = key.jpegheader
+
+    shape = (row1 - row0, col1 - col0)
+    if (out is not None and rows.step == 1 and cols.step == 1 and
+            out.shape == shape and out.dtype == key.dtype):
+        region = out
+    else:
+        region = np.empty(shape, dtype=key.dtype)
+
+    fh = page.parent.filehandle
+    for i in index:
+        data = None
+        if page.databytecounts[i]:
+            with fh.lock:
+                fh.seek(page.dataoffsets[i])
+                data = fh.read(page.databytecounts[i])
+        seg, pos, segshape = key.decode(data, i, **decodeargs)
+        y0, x0 = max(pos[2], row0), max(pos[3], col0)
+        y1 = min(pos[2] + segshape[1], row1)
+        x1 = min(pos[3] + segshape[2], col1)
+        if seg is None:
+            region[y0 - row0:y1 - row0, x0 - col0:x1 - col0] = 0
+        else:
+            seg = seg.reshape(segshape[1], segshape[2])
+            region[y0 - row0:y1 - row0, x0 - col0:x1 - col0] = \
+                seg[y0 - pos[2]:y1 - pos[2], x0 - pos[3]:x1 - pos[3]]
+    logger.debug('Decoded %d of %d segments', len(index),
+                 len(page.dataoffsets))
+
+    if region is out:
+        return out
+    arr = region[_relative_slice(rows, row0), _relative_slice(cols, col0)]
+    if out is not None:
+        out[...] = arr
+        arr = out
+    return arr
+
+
+def read_tiff_pages(fname, ind=None, slc=None, workers=None, mmap=False,
+                    out=None, shared=False):
+    """
+    Read pages of a multi-page (Big)TIFF file, such as a whole scan written
+    as one file.
+
+    Parameters
+    ----------
+    fname : str
+        String defining the path of file or file name.
+    ind : list of int, optional
+        Indices of the pages to read. Defaults to all pages.
+    slc : sequence of tuples, optional
+        Range of values for slicing each page.
+        ((start_1, end_1, step_1), (start_2, end_2, step_2))
+        defines slicing parameters for the rows and columns of the pages.
+    workers : int, optional
+        Number of threads decoding the pages concurrently.
+    mmap : bool, optional
+        If True and the selected pages are uncompressed and evenly spaced in
+        the file, return a read-only view of the memory-mapped file instead
+        of reading the data.
+    out : ndarray, optional
+        Array receiving the pages, of shape (len(ind), rows, columns) after
+        slicing.
+    shared : bool, optional
+        If True and out is not given, read data into shared memory location.
+
+    Returns
+    -------
+    ndarray
+        Output 3D image.
+    """
+    fname = _check_read(fname)
+    with tifffile.TiffFile(fname) as tif:
+        tif.pages.useframes = True
+        tif.filehandle.set_lock(True)
+        if ind is None:
+            ind = range(len(tif.pages))
+        pages = [tif.pages[m] for m in ind]
+        key = tif.pages[0]
+        if len(key.shape) != 2:
+            raise ValueError('Only 2D pages are supported in read_tiff_pages')
+        size = (len(pages), ) + _shape_after_slice(key.shape, slc)
+
+        if mmap and out is None:
+            arr = _memmap_tiff_pages(tif, pages, slc)
+            if arr is not None:
+                _log_imported_data(fname, arr)
+                return arr
+
+        if out is not None:
+            if out.shape != size:
+                raise ValueError('Output array has shape %s, expected %s'
+                                 % (out.shape, size))
+            arr = out
+        elif shared:
+            arr = empty_shared_array(size, key.dtype)
+        else:
+            arr = np.empty(size, dtype=key.dtype)
+
+        def _read(m):
+            _read_tiff_page(pages[m], slc, arr[m])
+
+        _map_workers(_read, range(len(pages)), workers)
     _log_imported_data(fname, arr)
     return arr
 
 
-def read_tiff_stack(fname, ind, digit=None, slc=None, angle=None, mblur=None):
+def _read_tiff_page(page, slc, out):
+    """
+    Read the rows and columns selected by slc of one page into out.
+    """
+    if not page.is_contiguous:
+        if _read_tiff_segments(page, slc, out) is None:
+            out[...] = _slice_array(page.asarray(), slc)
+        return out
+    # uncompressed: read only the span of rows selected
+    length, width = page.shape
+    slc = _make_slice_object_a_tuple(slc or ()) + (slice(None), ) * 2
+    rows = range(*slc[0].indices(length))
+    if len(rows) == 0:
+        return out
+    row0, row1 = min(rows), max(rows) + 1
+    dtype = np.dtype(page.parent.byteorder + page.dtype.char)
+    rowbytes = width * dtype.itemsize
+    fh = page.parent.filehandle
+    with fh.lock:
+        fh.seek(page.dataoffsets[0] + row0 * rowbytes)
+        data = fh.read((row1 - row0) * rowbytes)
+    region = np.frombuffer(data, dtype).reshape(row1 - row0, width)
+    out[...] = region[_relative_slice(rows, row0), slc[1]]
+    return out
+
+
+def _memmap_tiff_pages(tif, pages, slc):
+    """
+    Return a memory-mapped view of uncompressed, evenly spaced pages, or
+    None when the pages cannot be viewed as one strided array.
+    """
+    if not all(page.is_contiguous for page in pages):
+        return None
+    key = tif.pages[0]
+    dtype = np.dtype(tif.byteorder + key.dtype.char)
+    length, width = key.shape
+    nbytes = length * width * dtype.itemsize
+    offsets = [page.dataoffsets[0] for page in pages]
+    stride = offsets[1] - offsets[0] if len(offsets) > 1 else nbytes
+    if stride < nbytes or any(b - a != stride for a, b in
+                              zip(offsets[:-1], offsets[1:])):
+        return None
+    mm = np.memmap(tif.filehandle.path, dtype=np.uint8, mode='r',
+                   offset=offsets[0], shape=(stride * (len(pages) - 1) + nbytes, ))
+    arr = np.ndarray((len(pages), length, width), dtype=dtype, buffer=mm,
+                     strides=(stride, width * dtype.itemsize, dtype.itemsize))
+    slc = _make_slice_object_a_tuple(slc or ())
+    return arr[(slice(None), ) + slc]
+
+
+def _relative_slice(rng, offset):
+    """
+    Return the slice selecting range rng from an array starting at offset.
+    """
+    start = rng.start - offset
+    stop = start + len(rng) * rng.step
+    if stop < 0:
+        stop = None
+    return slice(start, stop, rng.step)
+
+
+def read_tiff_stack(fname, ind, digit=None, slc=None, angle=None, mblur=None,
+                    workers=None, out=None, shared=False):
     """
     Read data from stack of tiff files in a folder.
 
@@ -186,6 +421,14 @@ def read_tiff_stack(fname, ind, digit=None, slc=None, angle=None, mblur=None):
         defines slicing parameters for each axis of the data matrix.
     angle : angle to rotate after reading the tiff image
     mblue : median filter
+    workers : int, optional
+        Number of threads decoding the files concurrently. Defaults to the
+        thread pool default, 1 reads the files one after another.
+    out : ndarray, optional
+        Array receiving the stack, of shape (len(ind), rows, columns) after
+        slicing. Each file is decoded into its slot of this array.
+    shared : bool, optional
+        If True and out is not given, read data into shared memory location.
 
     Returns
     -------
@@ -195,14 +438,319 @@ def read_tiff_stack(fname, ind, digit=None, slc=None, angle=None, mblur=None):
     fname = _check_read(fname)
     list_fname = _list_file_stack(fname, ind, digit)
 
-    arr = _init_arr_from_stack(list_fname[0], len(ind), slc)
-    for m, fname in enumerate(list_fname):
-        arr[m] = read_tiff(fname, slc, angle, mblur)
+    if angle or mblur is not None:
+        arr = _init_arr_from_stack(list_fname[0], len(ind), slc, out, shared)
+        _filter_tiff_stack(list_fname, arr, slc, angle, mblur, workers)
+        _log_imported_data(fname, arr)
+        return arr
+
+    # uncompressed stacks with identical layouts: read rows at known offsets
+    layout = _tiff_stack_layout(list_fname[0])
+    arr = _init_arr_from_stack(list_fname[0], len(ind), slc, out, shared,
+                               layout)
+
+    def _read(m):
+        if layout is not None and _read_tiff_indexed(
+                layout, list_fname[m], slc, arr[m]) is not None:
+            return
+        if read_tiff(list_fname[m], slc, angle, mblur, out=arr[m]) is False:
+            arr[m] = 0
+
+    _map_workers(_read, range(len(list_fname)), workers)
     _log_imported_data(fname, arr)
     return arr
 
 
-def read_xrm(fname, slice_range=None):
+_TiffLayout = namedtuple(
+    '_TiffLayout', ['size', 'shape', 'dtype', 'filedtype', 'offset', 'signature'])
+_tiff_layouts = {}
+_TIFF_LAYOUTS_MAX = 64
+
+
+def _tiff_stack_layout(fname):
+    """
+    Return the byte layout of an uncompressed single-page tiff file whose
+    image data is stored contiguously, or None for any other file.
+
+    Layouts are cached by file name, size and modification time, so that
+    repeated reads from the same stack skip parsing the first file.
+    """
+    try:
+        st = os.stat(fname)
+    except OSError:
+        return None
+    key = (fname, st.st_size, st.st_mtime)
+    if key in _tiff_layouts:
+        return _tiff_layouts[key]
+
+    layout = None
+    with tifffile.TiffFile(fname) as tif:
+        page = tif.pages[0]
+        if (len(tif.pages) == 1 and page.is_contiguous and
+                len(page.shape) == 2):
+            fd = os.open(fname, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                signature = _tiff_signature(fd)
+            finally:
+                os.close(fd)
+            layout = _TiffLayout(
+                st.st_size, page.shape, page.dtype,
+                np.dtype(tif.byteorder + page.dtype.char),
+                page.dataoffsets[0], signature)
+
+    if len(_tiff_layouts) >= _TIFF_LAYOUTS_MAX:
+        _tiff_layouts.pop(next(iter(_tiff_layouts)))
+    _tiff_layouts[key] = layout
+    return layout
+
+
+def _tiff_signature(fd):
+    """
+    Return the header and the first IFD layout of a tiff file: the
+    (tag, type, count) of every entry plus the raw entries of the strip
+    offsets, strip byte counts and the tags defining the image geometry and
+    sample format. Files with equal signatures and sizes store the same
+    kind of image data at the same offsets.
+    """
+    header = _pread(fd, 16, 0)
+    byteorder = {b'II': '<', b'MM': '>'}.get(header[:2])
+    if byteorder is None:
+        return None
+    if struct.unpack(byteorder + 'H', header[2:4])[0] == 43:  # BigTIFF
+        header = header[:16]
+        ifd_offset = struct.unpack(byteorder + 'Q', header[8:16])[0]
+        countfmt, entryfmt, entrysize = 'Q', 'HHQ', 20
+    else:
+        header = header[:8]
+        ifd_offset = struct.unpack(byteorder + 'I', header[4:8])[0]
+        countfmt, entryfmt, entrysize = 'H', 'HHI', 12
+    countsize = struct.calcsize(countfmt)
+    count = struct.unpack(byteorder + countfmt,
+                          _pread(fd, countsize, ifd_offset))[0]
+    entries = _pread(fd, count * entrysize, ifd_offset + countsize)
+    signature = [header]
+    fmtsize = struct.calcsize(byteorder + entryfmt)
+    for m in range(count):
+        entry = entries[m * entrysize:(m + 1) * entrysize]
+        tag = struct.unpack(byteorder + entryfmt, entry[:fmtsize])
+        signature.append(tag)
+        if tag[0] in _TIFF_SIGNATURE_TAGS:
+            signature.append(entry)
+            size = _TIFF_TYPE_SIZES.get(tag[1], 1) * tag[2]
+            if size > entrysize - fmtsize:
+                # values stored out of the entry, compare them as well
+                offset = struct.unpack(byteorder + entryfmt[-1],
+                                       entry[fmtsize:])[0]
+                signature.append(_pread(fd, size, offset))
+    return tuple(signature)
+
+
+# ImageWidth, ImageLength, BitsPerSample, Compression, Photometric,
+# StripOffsets, SamplesPerPixel, StripByteCounts, PlanarConfiguration,
+# Predictor, SampleFormat
+_TIFF_SIGNATURE_TAGS = frozenset(
+    (256, 257, 258, 259, 262, 273, 277, 279, 284, 317, 339))
+
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4,
+                    10: 8, 11: 4, 12: 8, 16: 8, 17: 8, 18: 8}
+
+
+def _read_tiff_indexed(layout, fname, slc, out):
+    """
+    Read the rows and columns selected by slc of an uncompressed tiff file
+    into out with positioned reads, using the layout of another file of the
+    stack. Returns None if the file layout does not match.
+    """
+    try:
+        fd = os.open(fname, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError:
+        return None
+    try:
+        if (os.fstat(fd).st_size != layout.size or
+                _tiff_signature(fd) != layout.signature):
+            logger.debug('Tiff layout differs from stack: %s', fname)
+            return None
+        length, width = layout.shape
+        slc = _make_slice_object_a_tuple(slc or ()) + (slice(None), ) * 2
+        rows = range(*slc[0].indices(length))
+        if len(rows) == 0:
+            return out
+        row0, row1 = min(rows), max(rows) + 1
+        rowbytes = width * layout.filedtype.itemsize
+        offset = layout.offset + row0 * rowbytes
+        if (hasattr(os, 'preadv') and rows.step == 1 and
+                slc[1] == slice(None) and out.dtype == layout.filedtype and
+                out.flags.c_contiguous and out.shape == (len(rows), width)):
+            # read straight into the output
+            if os.preadv(fd, [memoryview(out).cast('B')], offset) == out.nbytes:
+                return out
+        data = _pread(fd, (row1 - row0) * rowbytes, offset)
+        region = np.frombuffer(data, layout.filedtype).reshape(-1, width)
+        out[...] = region[_relative_slice(rows, row0), slc[1]]
+        return out
+    finally:
+        os.close(fd)
+
+
+def _pread(fd, size, offset):
+    """
+    Read size bytes at offset of a file descriptor.
+    """
+    if hasattr(os, 'pread'):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def _filter_tiff_stack(list_fname, arr, slc, angle, mblur, workers,
+                       batch=16):
+    """
+    Read a tiff stack into arr applying the median filter and rotation of
+    read_tiff to batches of frames.
+
+    The rotation geometry is computed once for the output region selected
+    by slc and only that region is interpolated. Without rotation, only the
+    rows and columns in slc plus the median filter margin are read.
+    """
+    with tifffile.TiffFile(list_fname[0]) as tif:
+        shape = tif.pages[0].shape
+    slc = _make_slice_object_a_tuple(slc or ()) + (slice(None), ) * 2
+    rows = range(*slc[0].indices(shape[0]))
+    cols = range(*slc[1].indices(shape[1]))
+    if len(rows) == 0 or len(cols) == 0:
+        return arr
+
+    if angle:
+        region = (slice(0, shape[0]), slice(0, shape[1]))
+        coords = _rotation_coordinates(shape, angle, rows, cols)
+    else:
+        margin = mblur // 2
+        region = (slice(max(min(rows) - margin, 0),
+                        min(max(rows) + margin + 1, shape[0])),
+                  slice(max(min(cols) - margin, 0),
+                        min(max(cols) + margin + 1, shape[1])))
+        crop = (_relative_slice(rows, region[0].start),
+                _relative_slice(cols, region[1].start))
+
+    def _process(start):
+        frames = range(start, min(start + batch, len(list_fname)))
+        buf = np.empty(
+            (len(frames), region[0].stop - region[0].start,
+             region[1].stop - region[1].start), dtype=arr.dtype)
+        for n, m in enumerate(frames):
+            if read_tiff(list_fname[m], region, out=buf[n]) is False:
+                buf[n] = 0
+        if mblur is not None:
+            if mblur == 3 and buf.dtype.kind in 'ui':
+                buf = _median3_filter(buf)
+            else:
+                buf = median_filter(buf, size=(1, mblur, mblur))
+        for n, m in enumerate(frames):
+            if angle:
+                map_coordinates(buf[n], coords, output=arr[m], order=3,
+                                mode='constant', cval=0.0, prefilter=True)
+            else:
+                arr[m] = buf[n][crop]
+
+    _map_workers(_process, range(0, len(list_fname), batch), workers)
+    return arr
+
+
+def _rotation_coordinates(shape, angle, rows, cols):
+    """
+    Return the input coordinates that rotate(reshape=False) samples for the
+    output pixels in rows x cols, for use with map_coordinates.
+    """
+    c, s = cosdg(angle), sindg(angle)
+    matrix = np.array([[c, s], [-s, c]])
+    center = (np.asarray(shape) - 1) / 2.
+    offset = center - matrix @ center
+    grid = np.array(np.meshgrid(np.asarray(rows), np.asarray(cols),
+                                indexing='ij'), dtype=np.float64)
+    return np.tensordot(matrix, grid, axes=1) + offset[:, None, None]
+
+
+def _median3_filter(arr):
+    """
+    3x3 median filter of each frame of a 3D integer array.
+
+    Equivalent to median_filter(arr, size=(1, 3, 3)) but computed with a
+    min/max sorting network over shifted views of the frames.
+    """
+    pad = np.pad(arr, ((0, 0), (1, 1), (1, 1)), mode='symmetric')
+    ny, nx = arr.shape[1:]
+    p = [pad[:, i:i + ny, j:j + nx] for i in range(3) for j in range(3)]
+
+    def _sort(a, b):
+        p[a], p[b] = np.minimum(p[a], p[b]), np.maximum(p[a], p[b])
+
+    # Paeth's median of 9 network
+    for a, b in ((1, 2), (4, 5), (7, 8), (0, 1), (3, 4), (6, 7), (1, 2),
+                 (4, 5), (7, 8), (0, 3), (5, 8), (4, 7), (3, 6), (1, 4),
+                 (2, 5), (4, 7), (4, 2), (6, 4), (4, 2)):
+        _sort(a, b)
+    return p[4]
+
+
+def iter_tiff_stack(fname, ind, chunk=64, prefetch=1, digit=None, slc=None,
+                    angle=None, mblur=None, workers=None):
+    """
+    Iterate over a stack of tiff files in blocks of consecutive files.
+
+    While a block is processed by the caller, the next blocks are decoded
+    in the background, so that at most prefetch + 1 blocks are held in
+    memory regardless of the stack length.
+
+    Parameters
+    ----------
+    fname : str
+        One of the file names in the tiff stack.
+    ind : list of int
+        Indices of the files to read.
+    chunk : int, optional
+        Number of files in each block.
+    prefetch : int, optional
+        Number of blocks decoded ahead of the one being consumed.
+    digit : int
+        (Deprecated) Number of digits used in indexing stacked files.
+    slc : sequence of tuples, optional
+        Range of values for slicing data in each axis.
+        ((start_1, end_1, step_1), ... , (start_N, end_N, step_N))
+        defines slicing parameters for each axis of the data matrix.
+    angle : angle to rotate after reading the tiff image
+    mblur : median filter
+    workers : int, optional
+        Number of threads decoding the files of a block.
+
+    Yields
+    ------
+    list of int
+        Indices of the files in the block.
+    ndarray
+        3D image block.
+    """
+    ind = list(ind)
+    blocks = (ind[m:m + chunk] for m in range(0, len(ind), chunk))
+
+    def _read(block):
+        return block, read_tiff_stack(fname, block, digit, slc, angle, mblur,
+                                      workers=workers)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(prefetch, 1)) as executor:
+        try:
+            for block in blocks:
+                pending.append(executor.submit(_read, block))
+                if len(pending) > prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def read_xrm(fname, slice_range=None, mmap=False):
     """
     Read data from xrm file.
 
@@ -214,6 +762,9 @@ def read_xrm(fname, slice_range=None):
         Range of values for slicing data in each axis.
         ((start_1, end_1, step_1), ... , (start_N, end_N, step_N))
         defines slicing parameters for each axis of the data matrix.
+    mmap : bool, optional
+        If True, return a read-only memory mapped view of the image when its
+        sectors are contiguous in the file, a copy otherwise.
 
     Returns
     -------
@@ -229,24 +780,12 @@ def read_xrm(fname, slice_range=None):
 
     metadata = read_ole_metadata(ole)
 
-    if slice_range is None:
-        slice_range = (slice(None), slice(None))
+    if mmap:
+        arr = _map_ole_image(ole, fname, "ImageData1/Image1",
+                             _ole_image_region(metadata, slc=slice_range))
     else:
-        slice_range = _make_slice_object_a_tuple(slice_range)
-
-    stream = ole.openstream("ImageData1/Image1")
-    data = stream.read()
-
-    data_type = _get_ole_data_type(metadata)
-    data_type = data_type.newbyteorder('<')
-
-    arr = np.reshape(
-        np.fromstring(data, data_type),
-        (
-            metadata["image_width"],
-            metadata["image_height"]
-        )
-    )[slice_range]
+        arr = _read_ole_image(ole, "ImageData1/Image1", metadata,
+                              slc=slice_range)
 
     _log_imported_data(fname, arr)
 
@@ -255,10 +794,13 @@ def read_xrm(fname, slice_range=None):
 
 
 #  Should slc just take over what ind is doing here?
-def read_xrm_stack(fname, ind, slc=None):
+def read_xrm_stack(fname, ind, slc=None, workers=None):
     """
     Read data from stack of xrm files in a folder.
 
+    The full metadata is only parsed from the first file; for the rest of
+    the stack only the angle and position streams are read.
+
     Parameters
     ----------
     fname : str
@@ -269,34 +811,69 @@ def read_xrm_stack(fname, ind, slc=None):
         Range of values for slicing data in each axis.
         ((start_1, end_1, step_1), ... , (start_N, end_N, step_N))
         defines slicing parameters for each axis of the data matrix.
+    workers : int, optional
+        Number of threads decoding files. Defaults to the executor default,
+        1 reads the files serially.
 
     Returns
     -------
     ndarray
         Output 3D image.
+    dict
+        Metadata of the first file, with the angles and positions of every
+        file in the stack.
     """
     fname = _check_read(fname)
     list_fname = _list_file_stack(fname, ind)
 
-    number_of_images = len(ind)
-    arr, metadata = _init_ole_arr_from_stack(
-        list_fname[0], number_of_images, slc)
-    del metadata["thetas"][0]
-    del metadata["x_positions"][0]
-    del metadata["y_positions"][0]
-    del metadata["z_positions"][0]
-
-    for m, fname in enumerate(list_fname):
-        arr[m], angle_metadata = read_xrm(fname, slc)
-        metadata["thetas"].append(angle_metadata["thetas"][0])
-        metadata["x_positions"].append(angle_metadata["x_positions"][0])
-        metadata["y_positions"].append(angle_metadata["y_positions"][0])
-        metadata["z_positions"].append(angle_metadata["z_positions"][0])
+    ole = olefile.OleFileIO(list_fname[0])
+    try:
+        metadata = read_ole_metadata(ole)
+    finally:
+        ole.close()
+    size = (len(list_fname), ) + _shape_after_slice(
+        (metadata["image_height"], metadata["image_width"]), slc)
+    logger.debug('Data initialized with size: %s', size)
+    arr = np.empty(size, dtype=_get_ole_data_type(metadata))
+
+    def _read(item):
+        m, name = item
+        ole = olefile.OleFileIO(name)
+        try:
+            arr[m] = _read_ole_image(
+                ole, "ImageData1/Image1", metadata, slc=slc)
+            return _read_ole_positions(ole)
+        finally:
+            ole.close()
+
+    positions = _map_workers(_read, enumerate(list_fname), workers)
+    for key in _OLE_POSITIONS:
+        metadata[key] = [p[key] for p in positions]
 
     _log_imported_data(fname, arr)
     return arr, metadata
 
 
+_OLE_POSITIONS = {
+    'thetas': 'ImageInfo/Angles',
+    'x_positions': 'ImageInfo/XPosition',
+    'y_positions': 'ImageInfo/YPosition',
+    'z_positions': 'ImageInfo/ZPosition',
+}
+
+
+def _read_ole_positions(ole):
+    """
+    Read the angle and stage positions of a single image ole file.
+    """
+    positions = {key: _read_ole_arr(ole, label, "<1f")
+                 for key, label in _OLE_POSITIONS.items()}
+    if positions['thetas'] is not None:
+        # NOTE: converting theta to radians from degrees
+        positions['thetas'] = positions['thetas'] * np.pi / 180.
+    return positions
+
+
 def read_aps_1id_metafile(metafn):
     """
     Parse log file generated at APS 1-ID
@@ -411,10 +988,13 @@ def read_aps_1id_metafile(metafn):
     return pd.concat(dfs, ignore_index=True)
 
 
-def read_txrm(file_name, slice_range=None):
+def read_txrm(file_name, slice_range=None, workers=None, mmap=False):
     """
     Read data from a .txrm file, a compilation of .xrm files.
 
+    The sectors holding every requested image are located first, the
+    images are then read with positioned reads and decoded concurrently.
+
     Parameters
     ----------
     file_name : str
@@ -423,11 +1003,18 @@ def read_txrm(file_name, slice_range=None):
         Range of values for slicing data in each axis.
         ((start_1, end_1, step_1), ... , (start_N, end_N, step_N))
         defines slicing parameters for each axis of the data matrix.
+    workers : int, optional
+        Number of threads reading images. Defaults to the executor default,
+        1 reads the images serially.
+    mmap : bool, optional
+        If True, nothing is read up front: a list of read-only memory mapped
+        views is returned, one per image, with a copy for the images whose
+        sectors are not contiguous in the file.
 
     Returns
     -------
-    ndarray
-        Array of 2D images.
+    ndarray or list of ndarray
+        Array of 2D images, or list of 2D images if mmap is True.
 
     dictionary
         Dictionary of metadata.
@@ -441,16 +1028,13 @@ def read_txrm(file_name, slice_range=None):
 
     metadata = read_ole_metadata(ole)
 
-    array_of_images = np.empty(
-        _shape_after_slice(
-            (
-                metadata["number_of_images"],
-                metadata["image_height"],
-                metadata["image_width"],
-            ),
-            slice_range
+    shape = _shape_after_slice(
+        (
+            metadata["number_of_images"],
+            metadata["image_height"],
+            metadata["image_width"],
         ),
-        dtype=_get_ole_data_type(metadata)
+        slice_range
     )
 
     if slice_range is None:
@@ -458,22 +1042,50 @@ def read_txrm(file_name, slice_range=None):
     else:
         slice_range = _make_slice_object_a_tuple(slice_range)
 
-    for i, idx in enumerate(range(*slice_range[0].indices(metadata["number_of_images"]))):
-        img_string = "ImageData{}/Image{}".format(
-            int(np.ceil((idx + 1) / 100.0)), int(idx + 1))
-        array_of_images[i] = _read_ole_image(ole, img_string, metadata)[slice_range[1:]]
-
     reference = metadata['reference']
     if reference is not None:
         metadata['reference'] = reference[slice_range[1:]]
 
-    _log_imported_data(file_name, array_of_images)
-
+    region = _ole_image_region(metadata, slc=slice_range[1:])
+    img_strings = [
+        "ImageData{}/Image{}".format(int(np.ceil((idx + 1) / 100.0)), int(idx + 1))
+        for idx in range(*slice_range[0].indices(metadata["number_of_images"]))]
+
+    if mmap:
+        images = [_map_ole_image(ole, file_name, img_string, region)
+                  for img_string in img_strings]
+        ole.close()
+        logger.info('Data mapped from file: %s', file_name)
+        return images, metadata
+
+    plan = []
+    for i, img_string in enumerate(img_strings):
+        runs = _ole_sector_runs(ole, img_string, region[1], region[2])
+        if runs is None:
+            # small images live in the mini stream, read them right away
+            runs = _read_ole_range(ole, img_string, region[1], region[2])
+        plan.append((i, runs))
     ole.close()
+
+    array_of_images = np.empty(shape, dtype=_get_ole_data_type(metadata))
+
+    f = _PositionedFile(file_name)
+
+    def _read(item):
+        i, runs = item
+        data = runs if isinstance(runs, bytes) else f.read(runs)
+        array_of_images[i] = _decode_ole_image(data, region)
+
+    try:
+        _map_workers(_read, plan, workers)
+    finally:
+        f.close()
+
+    _log_imported_data(file_name, array_of_images)
     return array_of_images, metadata
 
 
-def read_txm(file_name, slice_range=None):
+def read_txm(file_name, slice_range=None, workers=None, mmap=False):
     """
     Read data from a .txm file, the reconstruction file output
     by Zeiss software.
@@ -486,17 +1098,23 @@ def read_txm(file_name, slice_range=None):
         Range of values for slicing data in each axis.
         ((start_1, end_1, step_1), ... , (start_N, end_N, step_N))
         defines slicing parameters for each axis of the data matrix.
+    workers : int, optional
+        Number of threads reading images. Defaults to the executor default,
+        1 reads the images serially.
+    mmap : bool, optional
+        If True, return a list of read-only memory mapped views of the
+        images, see read_txrm.
 
     Returns
     -------
-    ndarray
-        Array of 2D images.
+    ndarray or list of ndarray
+        Array of 2D images, or list of 2D images if mmap is True.
 
     dictionary
         Dictionary of metadata.
     """
 
-    return read_txrm(file_name, slice_range)
+    return read_txrm(file_name, slice_range, workers, mmap)
 
 
 def read_ole_metadata(ole):
@@ -561,24 +1179,43 @@ def _log_imported_data(fname, arr):
     logger.info('Data successfully imported: %s', fname)
 
 
-def _init_arr_from_stack(fname, number_of_files, slc):
+def _map_workers(func, items, workers=None):
     """
-    Initialize numpy array from files in a folder.
+    Apply a function to every item, in a thread pool unless workers is 1.
+
+    Exceptions raised by func are propagated to the caller.
     """
-    _arr = read_tiff(fname, slc)
-    size = (number_of_files, _arr.shape[0], _arr.shape[1])
-    logger.debug('Data initialized with size: %s', size)
-    return np.empty(size, dtype=_arr.dtype)
+    if workers == 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
 
 
-def _init_ole_arr_from_stack(fname, number_of_files, slc):
+def _init_arr_from_stack(fname, number_of_files, slc, out=None, shared=False,
+                         layout=None):
     """
     Initialize numpy array from files in a folder.
+
+    Only the header of the first file is parsed to get the image shape,
+    unless its layout is already known.
     """
-    _arr, metadata = read_xrm(fname, slc)
-    size = (number_of_files, _arr.shape[0], _arr.shape[1])
+    if layout is not None:
+        size = (number_of_files, ) + _shape_after_slice(layout.shape, slc)
+        dtype = layout.dtype
+    else:
+        with tifffile.TiffFile(fname) as tif:
+            page = tif.pages[0]
+            size = (number_of_files, ) + _shape_after_slice(page.shape, slc)
+            dtype = page.dtype
+    if out is not None:
+        if out.shape != size:
+            raise ValueError('Output array has shape %s, expected %s'
+                             % (out.shape, size))
+        return out
     logger.debug('Data initialized with size: %s', size)
-    return np.empty(size, dtype=_arr.dtype), metadata
+    if shared:
+        return empty_shared_array(size, dtype)
+    return np.empty(size, dtype=dtype)
 
 
 def _get_ole_data_type(metadata, datatype=None):
@@ -643,7 +1280,7 @@ def read_dx_dims(fname, dataset):
 
     grp = '/'.join(['exchange', dataset])
 
-    with h5py.File(fname, "r") as f:
+    with _open_hdf5(fname) as f:
         try:
             data = f[grp]
         except KeyError:
@@ -653,7 +1290,7 @@ def read_dx_dims(fname, dataset):
 
     return shape
 
-def read_hdf_meta(fname, add_shape=True):
+def read_hdf_meta(fname, add_shape=True, max_elements=10000):
     """
     Get meta data and tree view of a generic hdf file.
 
@@ -663,6 +1300,9 @@ def read_hdf_meta(fname, add_shape=True):
         Path to the file.
     add_shape : bool
         Including the shape of a dataset to the tree if True.
+    max_elements : int, optional
+        Datasets with more elements are not read, their value is replaced
+        by a description of their shape and dtype. None reads all of them.
 
     Returns
     -------
@@ -673,13 +1313,122 @@ def read_hdf_meta(fname, add_shape=True):
         list[0] contains the meta data value; list[1] its attribute (e.g. units).
     """
 
-    mp = Hdf5MetadataReader(fname)
+    mp = Hdf5MetadataReader(fname, readOnOpen=False, maxElements=max_elements)
     meta = mp.readMetadata()
     mp.close()
 
     return meta
 
 
+def _decode_units(attrs):
+    """
+    Return the units attribute of an hdf5 object as str, or None.
+    """
+    units = attrs.get('units')
+    if isinstance(units, np.ndarray) and units.size == 1:
+        units = units.flat[0]
+    if isinstance(units, bytes):
+        units = units.decode('utf-8')
+    return units
+
+
+_meta_layouts = {
+    'dx': {
+        'resolution':               '/measurement/instrument/detection_system/objective/resolution',
+        'sample_detector_distance': '/measurement/instrument/detector_motor_stack/setup/z',
+        'energy':                   '/measurement/instrument/monochromator/energy',
+        'end_time':                 '/process/acquisition/end_date',
+    },
+    'nexus-esrf': {
+        'resolution':               '/entry0000/instrument/detector/real_x_pixel_size',
+        'sample_detector_distance': '/entry0000/instrument/detector/distance',
+        'energy':                   '/entry0000/instrument/beam/incident_energy',
+        'end_time':                 '/entry0000/end_time',
+    },
+    'nexus-dls': {
+        'resolution':               '/entry1/tomo_entry/instrument/detector/x_pixel_size',
+        'sample_detector_distance': '/entry1/tomo_entry/instrument/detector/distance',
+        'end_time':                 '/entry1/end_time',
+    },
+    'nexus-desy': {
+        'resolution':               '/entry/hardware/camera1/resolution',
+        'sample_detector_distance': '/entry/scan/setup/pos_o_ccd_dist',
+        'energy':                   '/entry/scan/setup/p07_energy',
+    },
+}
+
+
+def register_meta_layout(file_format, paths):
+    """
+    Register the hdf layout of a file format for create_standard_meta.
+
+    Parameters
+    ----------
+    file_format : str
+        Name of the hdf layout, replaced if already registered.
+
+    paths : dict
+        Maps standard meta data names (e.g. 'resolution', 'energy') to the
+        path of the dataset holding them.
+    """
+    _meta_layouts[file_format] = dict(paths)
+
+
+def read_hdf_meta_paths(fname, paths, max_elements=10000):
+    """
+    Get the meta data stored in the given datasets of a hdf file.
+
+    Only the requested datasets are opened, the rest of the file is not
+    traversed.
+
+    Parameters
+    ----------
+    fname : str
+        Path to the file.
+    paths : sequence of str
+        Paths of the datasets to read.
+    max_elements : int, optional
+        Datasets with more elements are not read, their value is replaced
+        by a description of their shape and dtype. None reads all of them.
+
+    Returns
+    -------
+    meta : dict
+        Dictionary with dict[path] = [value, units] for every dataset found
+        holding meta data.
+    """
+    meta = {}
+    with _open_hdf5(fname) as f:
+        for path in paths:
+            obj = f.get(path)
+            if isinstance(obj, h5py.Dataset):
+                item = _read_meta_item(obj, max_elements)
+                if item is not None:
+                    meta[path] = item
+    return meta
+
+
+def _read_meta_item(obj, max_elements):
+    """
+    Return [value, units] of a meta data dataset, or None for datasets
+    that are not meta data.
+    """
+    shape = obj.shape
+    # Scalars (ESRF, DLS) and datasets of shape (1, ...) (DESY, APS)
+    # are metadata, other arrays are skipped without being read.
+    if shape is None or (len(shape) and shape[0] != 1):
+        return None
+    if max_elements is not None and obj.size > max_elements:
+        value = '<%s array of shape %s>' % (obj.dtype, shape)
+    else:
+        value = obj[()]
+        if len(shape):
+            value = value[0]
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+    return [value, _decode_units(obj.attrs)]
+
+
 def create_standard_meta(file_name, file_format='dx'):
     """
     Create a standard meta data dict from different hdf formats
@@ -690,7 +1439,8 @@ def create_standard_meta(file_name, file_format='dx'):
         File name of the HDF5 input file
 
     file_format : str
-        Defines a specific hdf layout
+        Defines a specific hdf layout: 'dx', 'nexus-esrf', 'nexus-dls',
+        'nexus-desy' or one added with register_meta_layout
 
     Returns
     -------
@@ -700,38 +1450,171 @@ def create_standard_meta(file_name, file_format='dx'):
 
     std_meta = {}
 
-    meta = read_hdf_meta(file_name)
+    if file_format not in _meta_layouts:
+        logger.error('HDF file layout not supported')
+        return std_meta
+
+    layout = _meta_layouts[file_format]
+    meta = read_hdf_meta_paths(file_name, layout.values())
+    for key, path in layout.items():
+        if path not in meta:
+            logger.error('File: %s of data-type = %s is missing the definition of %s' % (file_name, file_format, path))
+            break
+        std_meta[key] = meta[path]
+
+    return std_meta
+
+
+_hdf5_files = OrderedDict()
+_hdf5_lock = threading.RLock()
+_hdf5_cache_size = 0
+# sizes of the active hdf5_cache blocks
+_hdf5_cache_blocks = []
 
+
+class _Hdf5Handle(object):
+    """
+    Open read-only hdf5 file with the stamp it was opened for and the
+    number of readers currently using it.
+    """
+
+    def __init__(self, path, stamp):
+        self.file = h5py.File(path, 'r')
+        self.stamp = stamp
+        self.users = 0
+        self.evicted = False
+
+
+@contextmanager
+def _open_hdf5(fname):
+    """
+    Context manager yielding an open read-only h5py.File for fname.
+
+    When the cache is enabled, handles are kept open in a process-wide LRU
+    cache keyed by path, and are reopened when the modification time or
+    size of the file changes.
+    """
+    path = os.path.abspath(fname)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size, os.getpid())
+    with _hdf5_lock:
+        handle = _hdf5_files.pop(path, None)
+        if handle is not None and handle.stamp[2] != stamp[2]:
+            # handles inherited from a parent process are not usable
+            _hdf5_files.clear()
+            handle = None
+        if handle is not None and handle.stamp != stamp:
+            _evict_hdf5(handle)
+            handle = None
+        if handle is None:
+            handle = _Hdf5Handle(path, stamp)
+        if _hdf5_cache_limit() > 0:
+            _hdf5_files[path] = handle
+            _trim_hdf5_cache()
+        else:
+            handle.evicted = True
+        handle.users += 1
     try:
-        if file_format == 'dx':
-            std_meta['resolution']               = meta['/measurement/instrument/detection_system/objective/resolution']
-            std_meta['sample_detector_distance'] = meta['/measurement/instrument/detector_motor_stack/setup/z']
-            std_meta['energy']                   = meta['/measurement/instrument/monochromator/energy']
-            std_meta['end_time']                 = meta['/process/acquisition/end_date']
-        elif file_format == 'nexus-esrf':
-            std_meta['resolution']               = meta['/entry0000/instrument/detector/real_x_pixel_size']
-            std_meta['sample_detector_distance'] = meta['/entry0000/instrument/detector/distance']
-            std_meta['energy']                   = meta['/entry0000/instrument/beam/incident_energy']
-            std_meta['end_time']                 = meta['/entry0000/end_time']
-        elif file_format == 'nexus-dls':
-            std_meta['resolution']               = meta['/entry1/tomo_entry/instrument/detector/x_pixel_size']
-            std_meta['sample_detector_distance'] = meta['/entry1/tomo_entry/instrument/detector/distance']
-            # std_meta['energy']                   = meta['/entry0000/instrument/beam/incident_energy']
-            std_meta['end_time']                 = meta['/entry1/end_time']
-        elif file_format == 'nexus-desy':
-            std_meta['resolution']               = meta['/entry/hardware/camera1/resolution']
-            std_meta['sample_detector_distance'] = meta['/entry/scan/setup/pos_o_ccd_dist']
-            std_meta['energy']                   = meta['/entry/scan/setup/p07_energy']
-            # std_meta['end_time']                 = meta['/entry1/end_time']
+        yield handle.file
+    finally:
+        with _hdf5_lock:
+            handle.users -= 1
+            if handle.evicted and not handle.users:
+                handle.file.close()
+
+
+def _evict_hdf5(handle):
+    """
+    Close a handle removed from the cache once no reader uses it.
+    """
+    handle.evicted = True
+    if not handle.users and handle.stamp[2] == os.getpid():
+        handle.file.close()
+
+
+def clear_hdf5_cache(fname=None):
+    """
+    Close the hdf5 files kept open by the readers.
+
+    Parameters
+    ----------
+    fname : str, optional
+        Only close this file. By default all files are closed.
+    """
+    with _hdf5_lock:
+        if fname is None:
+            handles = list(_hdf5_files.values())
+            _hdf5_files.clear()
         else:
-            logger.error('HDF file layout not supported')
-    except Exception as e:
-        logger.error('File: %s of data-type = %s is missing the definition of %s' % (file_name, file_format, e))
+            handles = [_hdf5_files.pop(os.path.abspath(fname), None)]
+        for handle in handles:
+            if handle is not None:
+                _evict_hdf5(handle)
 
-    return std_meta
+
+def set_hdf5_cache_size(size):
+    """
+    Set the number of hdf5 files kept open by the readers.
+
+    The cache is disabled by default: a file kept open read-only cannot be
+    opened for writing with h5py in the same process until it is closed
+    with clear_hdf5_cache.
+
+    Parameters
+    ----------
+    size : int
+        Maximum number of open files. 0 disables the cache.
+    """
+    global _hdf5_cache_size
+    with _hdf5_lock:
+        _hdf5_cache_size = max(int(size), 0)
+        _trim_hdf5_cache()
+
+
+def _hdf5_cache_limit():
+    """
+    Return the number of files the cache may hold: the size set with
+    set_hdf5_cache_size, or larger inside hdf5_cache blocks.
+    """
+    return max([_hdf5_cache_size] + _hdf5_cache_blocks)
+
+
+def _trim_hdf5_cache():
+    """
+    Close the least recently used files beyond the cache limit.
+    """
+    limit = _hdf5_cache_limit()
+    while len(_hdf5_files) > limit:
+        _evict_hdf5(_hdf5_files.popitem(last=False)[1])
 
 
-def read_hdf5(fname, dataset, slc=None, dtype=None, shared=False):
+@contextmanager
+def hdf5_cache(size=8):
+    """
+    Context manager keeping the hdf5 files opened by the readers open until
+    the block exits, so that several reads of one file share its handle.
+
+    Parameters
+    ----------
+    size : int, optional
+        Maximum number of open files while the block is active. The cache
+        stays enabled as long as a block is active in any thread, with the
+        largest of their sizes and of the size set with
+        set_hdf5_cache_size.
+    """
+    size = max(int(size), 0)
+    with _hdf5_lock:
+        _hdf5_cache_blocks.append(size)
+    try:
+        yield
+    finally:
+        with _hdf5_lock:
+            _hdf5_cache_blocks.remove(size)
+            _trim_hdf5_cache()
+
+
+def read_hdf5(fname, dataset, slc=None, dtype=None, shared=False,
+              workers=None, lazy=False):
     """
     Read data from hdf5 file from a specific group.
 
@@ -749,15 +1632,22 @@ def read_hdf5(fname, dataset, slc=None, dtype=None, shared=False):
         Convert data to this datatype on read if specified.
     shared : bool (optional)
         If True, read data into shared memory location.  Defaults to True.
+    workers : int, optional
+        Number of processes reading and decompressing the data in parallel,
+        each opening the file on its own. The data is then always read into
+        shared memory.
+    lazy : bool, optional
+        If True, return an Hdf5Array reading the data only when indexed.
 
     Returns
     -------
-    ndarray
+    ndarray or Hdf5Array
         Data.
     """
+    plan = None
     try:
         fname = _check_read(fname)
-        with h5py.File(fname, "r") as f:
+        with _open_hdf5(fname) as f:
             try:
                 data = f[dataset]
             except KeyError:
@@ -765,20 +1655,354 @@ def read_hdf5(fname, dataset, slc=None, dtype=None, shared=False):
                 logger.error('Unrecognized hdf5 dataset: "%s"' %
                              (str(dataset)))
                 return None
+            if lazy:
+                return Hdf5Array(fname, dataset, slc, dtype, workers)
             shape = _shape_after_slice(data.shape, slc)
             if dtype is None:
                 dtype = data.dtype
-            if shared:
+            parallel = workers is not None and workers > 1 and data.ndim
+            if shared or parallel:
                 arr = empty_shared_array(shape, dtype)
             else:
                 arr = np.empty(shape, dtype)
-            data.read_direct(arr, _make_slice_object_a_tuple(slc))
+            if parallel:
+                plan, nchunks, nbytes = _hdf5_read_plan(data, slc, 4 * workers)
+                plan = [(dataset, ) + piece for piece in plan]
+            elif data.chunks is None or not data.ndim:
+                data.read_direct(arr, _make_slice_object_a_tuple(slc))
+            else:
+                _read_hdf5_chunked(data, slc, arr)
     except KeyError:
         return None
+    if plan:
+        _read_hdf5_parallel(fname, plan, arr, workers)
     _log_imported_data(fname, arr)
     return arr
 
 
+_HDF5_PIECE_BYTES = 2**26
+
+
+def _hdf5_read_plan(data, slc, pieces=None):
+    """
+    Split the selection slc of a dataset along the first axis into pieces
+    covering whole rows of chunks, so that every chunk is decoded once and
+    only the chunks of one piece are held at a time. Contiguous datasets
+    are split as if stored in chunks of one row.
+
+    Returns the list of (source, destination) selections along with the
+    number of chunks and bytes decoded. If pieces is given, the selection
+    is split in at least that many pieces where possible.
+    """
+    chunks = data.chunks or (1, ) + data.shape[1:]
+    sel = _make_slice_object_a_tuple(slc) or ()
+    sel = tuple(sel) + (slice(None), ) * (data.ndim - len(sel))
+    ranges = [range(*s.indices(n)) for s, n in zip(sel, data.shape)]
+    counts = [len(set(i // c for i in rng))
+              for rng, c in zip(ranges, chunks)]
+    chunk_bytes = int(np.prod(chunks)) * data.dtype.itemsize
+    row_chunks = int(np.prod(counts[1:]))
+    rows_per_piece = max(1, _HDF5_PIECE_BYTES // max(1, row_chunks * chunk_bytes))
+    if pieces:
+        rows_per_piece = min(rows_per_piece, max(1, -(-counts[0] // pieces)))
+
+    plan = []
+    rows = ranges[0]
+    chunk_rows = [i // chunks[0] for i in rows]
+    m = 0
+    while m < len(rows):
+        # extend the piece to the end of its last row of chunks
+        last = chunk_rows[m] + rows_per_piece - 1
+        n = m
+        while n < len(rows) and chunk_rows[n] <= last:
+            n += 1
+        source = (slice(rows[m], rows[n - 1] + 1, rows.step), )
+        plan.append((source + sel[1:], (slice(m, n), )))
+        m = n
+    nchunks = counts[0] * row_chunks
+    return plan, nchunks, nchunks * chunk_bytes
+
+
+def _read_hdf5_chunked(data, slc, out):
+    """
+    Read the selection slc of a chunked dataset into out piece by piece.
+    """
+    plan, nchunks, nbytes = _hdf5_read_plan(data, slc)
+    for source, dest in plan:
+        data.read_direct(out, source, dest)
+    logger.debug('Read %s: %d chunks (%s) in %d pieces, %d bytes decoded '
+                 'for %d bytes returned', data.name, nchunks,
+                 data.compression, len(plan), nbytes, out.nbytes)
+
+
+_hdf5_worker = None
+
+
+def _read_hdf5_parallel(fname, plan, out, workers, clean=False):
+    """
+    Read the (dataset, source, destination) selections of plan into the
+    shared array out with a process pool.
+
+    Every process opens the file once and reads batches of consecutive
+    pieces. Pass clean=True when the file is held open by the calling
+    process: forked processes would inherit its handle, so the processes
+    are then started from a fork server, or spawned where there is none.
+    """
+    buf = out
+    while isinstance(buf, np.ndarray):
+        buf = buf.base
+    offset = out.ctypes.data - np.frombuffer(buf, np.uint8).ctypes.data
+    # the workers must not share the handle of the parent process
+    clear_hdf5_cache(fname)
+    processes = min(workers, len(plan))
+    # a few batches per process to balance the load
+    size = -(-len(plan) // (4 * processes))
+    batches = [plan[m:m + size] for m in range(0, len(plan), size)]
+    pool = _clean_context().Pool if clean else multiprocessing.Pool
+    with pool(processes, initializer=_init_hdf5_worker,
+              initargs=(buf, offset, out.shape, out.strides, out.dtype,
+                        fname)) as pool:
+        pool.map(_read_hdf5_batch, batches)
+    logger.debug('Read %s in %d pieces with %d processes',
+                 fname, len(plan), processes)
+
+
+def _clean_context():
+    """
+    Return a multiprocessing context whose processes do not inherit the
+    open files of this process.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    # import the reader once in the server instead of in every process
+    context.set_forkserver_preload(['dxchange.reader'])
+    return context
+
+
+def _init_hdf5_worker(buf, offset, shape, strides, dtype, fname):
+    global _hdf5_worker
+    out = np.ndarray(shape, dtype, buffer=buf, offset=offset, strides=strides)
+    _hdf5_worker = (out, h5py.File(fname, 'r'))
+
+
+def _read_hdf5_batch(pieces):
+    out, f = _hdf5_worker
+    for dataset, source, dest in pieces:
+        f[dataset].read_direct(out, source, dest)
+
+
+class Hdf5Array(object):
+    """
+    Lazy array view of a region of an hdf5 dataset.
+
+    Indexing reads only the requested region from the file, with basic
+    numpy indexing (integers, slices and Ellipsis). numpy.asarray reads
+    the whole region.
+
+    Parameters
+    ----------
+    fname : str
+        String defining the path of file or file name.
+    dataset : str
+        Path to the dataset inside hdf5 file where data is located.
+    slc : sequence of tuples, optional
+        Range of values for slicing data in each axis.
+        ((start_1, end_1, step_1), ... , (start_N, end_N, step_N))
+        defines slicing parameters for each axis of the data matrix.
+    dtype : numpy datatype, optional
+        Convert data to this datatype on read if specified.
+    workers : int, optional
+        Number of processes used for each read larger than one read piece
+        (64 MB), see read_hdf5. Smaller reads are not worth starting a
+        process pool and are done in place.
+    """
+
+    def __init__(self, fname, dataset, slc=None, dtype=None, workers=None):
+        with _open_hdf5(fname) as f:
+            data = f[dataset]
+            shape = data.shape
+            if dtype is None:
+                dtype = data.dtype
+        sel = _make_slice_object_a_tuple(slc) or ()
+        sel = tuple(sel) + (slice(None), ) * (len(shape) - len(sel))
+        self.fname = fname
+        self.dataset = dataset
+        self.dtype = np.dtype(dtype)
+        self.workers = workers
+        self._ranges = tuple(range(*s.indices(n)) for s, n in zip(sel, shape))
+
+    @property
+    def shape(self):
+        return tuple(len(r) for r in self._ranges)
+
+    @property
+    def ndim(self):
+        return len(self._ranges)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        if not self._ranges:
+            raise TypeError('len() of unsized object')
+        return len(self._ranges[0])
+
+    def __repr__(self):
+        return '<Hdf5Array %s:%s shape=%s dtype=%s>' % (
+            self.fname, self.dataset, self.shape, self.dtype)
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self[()]
+        if dtype is not None:
+            arr = arr.astype(dtype, copy=False)
+        return arr
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, )
+        if any(k is Ellipsis for k in key):
+            m = key.index(Ellipsis)
+            key = (key[:m] + (slice(None), ) * (self.ndim - len(key) + 1) +
+                   key[m + 1:])
+        if len(key) > self.ndim:
+            raise IndexError('too many indices for Hdf5Array')
+        key = key + (slice(None), ) * (self.ndim - len(key))
+
+        ranges, flip, squeeze = [], [], []
+        for axis, (k, rng) in enumerate(zip(key, self._ranges)):
+            if isinstance(k, slice):
+                rng = rng[k]
+            else:
+                m = rng[operator.index(k)]
+                rng = range(m, m + 1)
+                squeeze.append(axis)
+            if rng.step < 0:
+                # hdf5 only reads forward, flip after reading
+                rng = rng[::-1]
+                flip.append(axis)
+            ranges.append(rng)
+        arr = self._read(ranges)
+        if flip:
+            arr = np.flip(arr, tuple(flip))
+        if squeeze:
+            arr = arr.reshape([n for m, n in enumerate(arr.shape)
+                               if m not in squeeze])
+        return arr
+
+    def _read(self, ranges):
+        if any(len(rng) == 0 for rng in ranges):
+            return np.empty([len(rng) for rng in ranges], self.dtype)
+        slc = tuple((rng[0], rng[-1] + 1, rng.step) for rng in ranges)
+        nbytes = int(np.prod([len(rng) for rng in ranges])) * self.dtype.itemsize
+        workers = self.workers if nbytes > _HDF5_PIECE_BYTES else None
+        return read_hdf5(self.fname, self.dataset, slc=slc or None,
+                         dtype=self.dtype, workers=workers)
+
+
+class Hdf5TailReader(object):
+    """
+    Reader of the frames appended along the first axis of an hdf5 dataset
+    while the file is still being written in SWMR mode.
+
+    Each frame is read once: every poll returns only the frames appended
+    since the previous one.
+
+    Parameters
+    ----------
+    fname : str
+        String defining the path of file or file name.
+    dataset : str
+        Path to the dataset inside hdf5 file where data is located.
+    slc : sequence of tuples, optional
+        Range of values for slicing the data in each axis after the first.
+    dtype : numpy datatype, optional
+        Convert data to this datatype on read if specified.
+    start : int, optional
+        Index of the first frame to read.
+    """
+
+    def __init__(self, fname, dataset, slc=None, dtype=None, start=0):
+        fname = _check_read(fname)
+        # a handle opened without SWMR would not see the new frames
+        clear_hdf5_cache(fname)
+        self.file = h5py.File(fname, 'r', libver='latest', swmr=True)
+        self.data = self.file[dataset]
+        self.slc = tuple(slc or ())
+        self.dtype = self.data.dtype if dtype is None else np.dtype(dtype)
+        self.position = start
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def poll(self):
+        """
+        Read the frames appended since the last poll.
+
+        Returns
+        -------
+        ndarray
+            New frames, possibly none.
+        """
+        self.data.refresh()
+        stop = max(self.data.shape[0], self.position)
+        slc = ((self.position, stop), ) + self.slc
+        arr = np.empty(_shape_after_slice(self.data.shape, slc), self.dtype)
+        if len(arr):
+            if self.data.chunks is None:
+                self.data.read_direct(arr, _make_slice_object_a_tuple(slc))
+            else:
+                _read_hdf5_chunked(self.data, slc, arr)
+        self.position = stop
+        return arr
+
+    def follow(self, interval=1.0, timeout=None, total=None):
+        """
+        Yield the frames as they are appended.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Time in seconds between polls without new frames.
+        timeout : float, optional
+            Stop after this many seconds without new frames.
+        total : int, optional
+            Stop once the frame of index total - 1 has been read.
+
+        Yields
+        ------
+        range
+            Indices of the frames read.
+        ndarray
+            New frames.
+        """
+        idle = 0.0
+        while total is None or self.position < total:
+            start = self.position
+            arr = self.poll()
+            if len(arr):
+                idle = 0.0
+                yield range(start, self.position), arr
+            elif timeout is not None and idle >= timeout:
+                return
+            else:
+                time.sleep(interval)
+                idle += interval
+
+
 def read_netcdf4(fname, group, slc=None):
     """
     Read data from netcdf4 file from a specific group.
@@ -1057,7 +2281,7 @@ def find_dataset_group(fname):
     -------
     h5py.Group
     """
-    with h5py.File(fname, 'r') as h5object:
+    with _open_hdf5(fname) as h5object:
         yield _find_dataset_group(h5object)
 
 
@@ -1089,13 +2313,17 @@ def _count_proj(group, dname, nproj, digit=4, inter_bright=None):
     number is not present in metadata.
     """
 
-    body = os.path.splitext(dname)[0]
-    body = ''.join(body[:-digit])
-
-    regex = re.compile('.*(' + body + ').*')
-    count = len(list(filter(regex.match, list(group.keys()))))
+    index = _als_group_index(group)
+    kind = _als_name_kind(group, dname)
+    if kind is not None:
+        count = len(index[kind])
+    else:
+        body = os.path.splitext(dname)[0]
+        body = ''.join(body[:-digit])
+        regex = re.compile('.*(' + body + ').*')
+        count = len(list(filter(regex.match, list(group.keys()))))
 
-    if inter_bright > 0:
+    if inter_bright is not None and inter_bright > 0:
         count = count / (nproj / inter_bright + 2)
     elif inter_bright == 0:
         count = count / 2
@@ -1103,6 +2331,94 @@ def _count_proj(group, dname, nproj, digit=4, inter_bright=None):
     return int(count)
 
 
+_als_indexes = {}
+_ALS_INDEXES_MAX = 16
+
+
+_als_regexes = {}
+
+
+def _als_name_regex(group):
+    stem = group.name.split('/')[-1]
+    if stem not in _als_regexes:
+        _als_regexes[stem] = re.compile(
+            re.escape(stem) + r'(bak|drk)?_(\d+)(?:_(\d+))?\.\w+$')
+    return _als_regexes[stem]
+
+
+def _als_name_kind(group, dname):
+    """
+    Return 'tomo', 'bak' or 'drk' for a dataset name of an ALS BL8.3.2
+    group, or None if it does not follow the naming scheme.
+    """
+    match = _als_name_regex(group).match(dname)
+    if match is None:
+        return None
+    return match.group(1) or 'tomo'
+
+
+def _als_group_index(group):
+    """
+    Index the dataset names of an ALS BL8.3.2 group in one pass.
+
+    Names are classified into projections (stem_0000_NNNN), brights
+    (stembak_NNNN_OOOO) and darks (stemdrk_NNNN_OOOO), and stored for each
+    kind as an (n, 2) int32 array of their first and second index, -1 if
+    absent. The 'names' entry maps (kind, first, second) to the dataset
+    name. Indexes are cached by file, group and file modification time.
+    """
+    fname = group.file.filename
+    try:
+        st = os.stat(fname)
+        key = (fname, group.name, st.st_size, st.st_mtime_ns)
+    except OSError:
+        key = None
+    if key is not None and key in _als_indexes:
+        return _als_indexes[key]
+
+    regex = _als_name_regex(group)
+    rows = {'tomo': [], 'bak': [], 'drk': []}
+    names = {}
+    for name in group:
+        match = regex.match(name)
+        if match is not None:
+            kind, first, second = match.groups()
+            row = (int(first), -1 if second is None else int(second))
+            rows[kind or 'tomo'].append(row)
+            names[(kind or 'tomo', ) + row] = name
+    index = {kind: np.array(rows[kind], dtype=np.int32).reshape(-1, 2)
+             for kind in rows}
+    index['names'] = names
+
+    if key is not None:
+        if len(_als_indexes) >= _ALS_INDEXES_MAX:
+            _als_indexes.pop(next(iter(_als_indexes)))
+        _als_indexes[key] = index
+    return index
+
+
+def _als_resolve_names(group, names):
+    """
+    Return the dataset names of an ALS BL8.3.2 group matching the indices
+    of the given names, looked up in the cached index of the group. Names
+    not following the naming scheme or not in the index are unchanged.
+    """
+    regex = _als_name_regex(group)
+    index = None
+    resolved = []
+    for name in names:
+        match = regex.match(name)
+        if match is not None:
+            if index is None:
+                index = _als_group_index(group)
+            kind, first, second = match.groups()
+            key = (kind or 'tomo', int(first),
+                   -1 if second is None else int(second))
+            name = index['names'].get(key, name)
+        resolved.append(name)
+    return resolved
+
+
 def _map_loc(ind, loc):
     """
     Does a linear mapping of the indices where brights where taken within the
@@ -1160,19 +2476,143 @@ def _read_ole_arr(ole, label, struct_fmt):
     return arr
 
 
-def _read_ole_image(ole, label, metadata, datatype=None):
-    stream = ole.openstream(label)
-    data = stream.read()
+def _read_ole_image(ole, label, metadata, datatype=None, slc=None):
+    """
+    Read the rows and columns selected by slc of an image stream.
+
+    Only the bytes of the rows covering the selection are read.
+    """
+    region = _ole_image_region(metadata, datatype, slc)
+    data = _read_ole_range(ole, label, region[1], region[2])
+    return _decode_ole_image(data, region)
+
+
+def _ole_image_region(metadata, datatype=None, slc=None):
+    """
+    Return the (dtype, start, stop, shape, index) of the rows covering the
+    selection of an image stream: the byte range [start, stop) holding
+    them, their shape and the selection index relative to these rows.
+    """
     data_type = _get_ole_data_type(metadata, datatype)
     data_type = data_type.newbyteorder('<')
-    image = np.reshape(
-        np.frombuffer(data, data_type),
-        (metadata["image_height"], metadata["image_width"], )
-    )
-    return image
+    height, width = metadata["image_height"], metadata["image_width"]
+    sel = _make_slice_object_a_tuple(slc) or ()
+    sel = tuple(sel) + (slice(None), ) * (2 - len(sel))
+    rows = range(*sel[0].indices(height))
+    if not len(rows):
+        return data_type, 0, 0, (0, width), (slice(0, 0), ) + sel[1:]
+    row0 = min(rows[0], rows[-1])
+    row1 = max(rows[0], rows[-1]) + 1
+    row_bytes = width * data_type.itemsize
+    return (data_type, row0 * row_bytes, row1 * row_bytes, (row1 - row0, width),
+            (_relative_slice(rows, row0), ) + sel[1:])
+
+
+def _decode_ole_image(data, region):
+    """
+    Select the image region from the bytes read for it.
+    """
+    data_type, start, stop, shape, index = region
+    image = np.reshape(np.frombuffer(data, data_type), shape)
+    return image[index]
+
+
+def _ole_sector_runs(ole, label, start, stop):
+    """
+    Return the (file offset, size) runs of contiguous sectors holding the
+    bytes [start, stop) of a stream, or None for streams stored in the
+    mini stream.
+    """
+    entry = ole.direntries[ole._find(label)]
+    if entry.size < ole.minisectorcutoff:
+        return None
+    stop = min(stop, entry.size)
+    size = ole.sectorsize
+    runs = []
+    sect = entry.isectStart
+    for k in range(stop // size + (stop % size > 0)):
+        if k >= start // size:
+            offset = (sect + 1) * size
+            if runs and runs[-1][0] + runs[-1][1] == offset:
+                runs[-1][1] += size
+            else:
+                runs.append([offset, size])
+        sect = ole.fat[sect]
+    if runs:
+        # trim the first and last sectors to the requested bytes
+        runs[0][0] += start % size
+        runs[0][1] -= start % size
+        runs[-1][1] -= -stop % size
+    return [tuple(run) for run in runs]
+
+
+def _map_ole_image(ole, fname, label, region):
+    """
+    Return a read-only memory mapped view of an image region when the
+    sectors holding it are contiguous, a copy read from the file otherwise.
+    """
+    data_type, start, stop, shape, index = region
+    runs = _ole_sector_runs(ole, label, start, stop)
+    if runs is not None and len(runs) == 1:
+        offset, size = runs[0]
+        image = np.memmap(fname, dtype=data_type, mode='r', offset=offset,
+                          shape=shape)
+        return image[index]
+    return _decode_ole_image(_read_ole_range(ole, label, start, stop), region)
+
+
+def _read_ole_range(ole, label, start, stop):
+    """
+    Read the bytes [start, stop) of a stream, seeking to the sectors that
+    hold them instead of reading the whole stream.
+    """
+    runs = _ole_sector_runs(ole, label, start, stop)
+    if runs is None:
+        return ole.openstream(label).read()[start:stop]
+    data = bytearray()
+    for offset, size in runs:
+        ole.fp.seek(offset)
+        data += ole.fp.read(size)
+    return bytes(data)
+
+
+class _PositionedFile(object):
+    """
+    Read runs of bytes at given offsets of a file, from several threads.
+
+    Positioned reads do not share a file position, so they need no lock
+    where os.pread is available.
+    """
 
+    def __init__(self, fname):
+        self.fd = os.open(fname, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        self._lock = threading.Lock()
 
-def read_hdf5_stack(h5group, dname, ind, digit=4, slc=None, out_ind=None):
+    def _pread(self, size, offset):
+        if hasattr(os, 'pread'):
+            return os.pread(self.fd, size, offset)
+        with self._lock:
+            os.lseek(self.fd, offset, os.SEEK_SET)
+            return os.read(self.fd, size)
+
+    def read(self, runs):
+        data = bytearray()
+        for offset, size in runs:
+            end = offset + size
+            while offset < end:
+                chunk = self._pread(end - offset, offset)
+                if not chunk:
+                    raise IOError('Unexpected end of file at %d' % offset)
+                data += chunk
+                offset += len(chunk)
+        return bytes(data)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def read_hdf5_stack(h5group, dname, ind, digit=4, slc=None, out_ind=None,
+                    out=None, shared=False, workers=None):
     """
     Read data from stacked datasets in a hdf5 file
 
@@ -1197,67 +2637,177 @@ def read_hdf5_stack(h5group, dname, ind, digit=4, slc=None, out_ind=None):
         Outer level indices for files with two levels of indexing.
         i.e. [name_000_000.tif, name_000_001.tif, ..., name_000_lmn.tif,
         name_001_lmn.tif, ..., ..., name_fgh_lmn.tif]
+
+    out : ndarray, optional
+        Array receiving the data, of shape (number of datasets, rows,
+        columns) after slicing.
+
+    shared : bool, optional
+        If True and out is not given, read data into shared memory location.
+
+    workers : int, optional
+        Number of processes reading compressed datasets in parallel. The
+        data is then read into shared memory.
     """
 
     list_fname = _list_file_stack(dname, ind, digit)
 
     if out_ind is not None:
-        list_fname_ = []
-        for name in list_fname:
-            fname = (writer.get_body(name).split('/')[-1] + '_' + digit * '0' +
-                     writer.get_extension(name))
-            list_fname_.extend(_list_file_stack(fname, out_ind, digit))
-        list_fname = sorted(list_fname_, key=lambda x: str(x).split('_')[-1])
-
-    for m, image in enumerate(list_fname):
-        _arr = h5group[image]
-        _arr = _slice_array(_arr, slc)
-        if m == 0:
-            dx, dy, dz = _arr.shape
-            dx = len(list_fname)
-            arr = np.empty((dx, dy, dz), dtype=_arr.dtype)
-        arr[m] = _arr
+        # name_inner_outer, ordered by outer index first
+        list_fname = [writer.get_body(name).split('/')[-1] + '_' +
+                      str(m).zfill(digit) + writer.get_extension(name)
+                      for m in sorted(out_ind) for name in list_fname]
+
+    list_fname = _als_resolve_names(h5group, list_fname)
+    datasets = [h5group[image] for image in list_fname]
+    sel = _make_slice_object_a_tuple(slc)
+    dx, dy, dz = _shape_after_slice(datasets[0].shape, slc)
+    size = (len(datasets), dy, dz)
+    parallel = (workers is not None and workers > 1 and len(datasets) > 1 and
+                datasets[0].compression is not None)
+    if out is not None:
+        if out.shape != size:
+            raise ValueError('Output array has shape %s, expected %s'
+                             % (out.shape, size))
+        arr = out
+        parallel = parallel and is_sharedmem(out)
+    elif shared or parallel:
+        arr = empty_shared_array(size, datasets[0].dtype)
+    else:
+        arr = np.empty(size, dtype=datasets[0].dtype)
+
+    # each dataset holds one (1, rows, columns) image
+    if parallel:
+        plan = [(ds.name, sel, np.s_[m:m + 1])
+                for m, ds in enumerate(datasets)]
+        # the group keeps the file open in this process
+        _read_hdf5_parallel(h5group.file.filename, plan, arr, workers,
+                            clean=True)
+    else:
+        for m, ds in enumerate(datasets):
+            ds.read_direct(arr, sel, np.s_[m:m + 1])
 
     return arr
 
 
-def read_file_list(file_list):
+def read_file_list(file_list, slc=None, workers=None, out=None, shared=False):
     """
     Read data from stack of image files in a folder.
 
+    Files may be of different formats. The reader of each file is chosen
+    from its extension, or from its first bytes when the extension is not
+    known. Tiff, npy and edf files are supported, other image formats are
+    read with imageio when it is installed.
+
     Parameters
     ----------
 
     file_list : list of str
         List of file names to read, in order
-    """
-
-    f = file_list[0]
-    try:
-        readfunc = tifffile.imread
-        im = readfunc(f)
-    except ValueError:
-        readfunc = functools.partial(sm.imread, flatten=True)
-        im = readfunc(f)
+    slc : sequence of tuples, optional
+        Range of values for slicing data in each axis.
+        ((start_1, end_1, step_1), ... , (start_N, end_N, step_N))
+        defines slicing parameters for each axis of the data matrix.
+    workers : int, optional
+        Number of threads used to decode the files.
+    out : ndarray, optional
+        Array receiving the images, of shape (len(file_list), rows, columns)
+        after slicing.
+    shared : bool, optional
+        If True and out is not given, read data into shared memory location.
 
-    if len(im.shape) != 2:
+    Returns
+    -------
+    ndarray
+        Output 3D image.
+    """
+    im = _read_image(file_list[0], slc)
+    if im.ndim != 2:
         raise ValueError('Only 2D images are supported in read_file_list')
 
-    arr = np.zeros((len(file_list), im.shape[0], im.shape[1]), dtype=im.dtype)
-
+    size = (len(file_list), ) + im.shape
+    if out is not None:
+        if out.shape != size:
+            raise ValueError('Output array has shape %s, expected %s'
+                             % (out.shape, size))
+        arr = out
+    elif shared:
+        arr = empty_shared_array(size, im.dtype)
+    else:
+        arr = np.empty(size, dtype=im.dtype)
     arr[0] = im
-    for i, fn in enumerate(file_list[1:]):
-        arr[i + 1] = readfunc(fn)
 
+    def _read(m):
+        _read_image(file_list[m], slc, arr[m])
+
+    _map_workers(_read, range(1, len(file_list)), workers)
     return arr
 
 
+_IMAGE_EXTENSIONS = {'.tif': 'tiff', '.tiff': 'tiff', '.npy': 'npy',
+                     '.edf': 'edf'}
+
+_IMAGE_SIGNATURES = ((b'II*\x00', 'tiff'), (b'MM\x00*', 'tiff'),
+                     (b'II+\x00', 'tiff'), (b'MM\x00+', 'tiff'),
+                     (b'\x93NUMPY', 'npy'), (b'{', 'edf'))
+
+
+def _image_format(fname):
+    """
+    Guess the format of an image file from its extension or signature.
+    """
+    ext = os.path.splitext(fname)[1].lower()
+    if ext in _IMAGE_EXTENSIONS:
+        return _IMAGE_EXTENSIONS[ext]
+    with open(fname, 'rb') as f:
+        head = f.read(8)
+    for signature, fmt in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return fmt
+    return None
+
+
+def _read_image(fname, slc=None, out=None):
+    """
+    Read a 2D image of any supported format, optionally into out.
+    """
+    fmt = _image_format(fname)
+    if fmt == 'tiff':
+        arr = read_tiff(fname, slc, out=out)
+        if arr is False:
+            raise IOError('No such file or directory: %s' % fname)
+        return arr
+    if fmt == 'npy':
+        arr = np.load(fname, mmap_mode='r')
+    elif fmt == 'edf':
+        if EdfFile is None:
+            raise ImportError('EdfFile module is required to read ' + fname)
+        arr = EdfFile.EdfFile(fname, access='r').GetData(0)
+    else:
+        try:
+            import imageio
+        except ImportError:
+            raise ValueError('Unsupported image format: %s' % fname)
+        imread = getattr(imageio, 'v2', imageio).imread
+        arr = np.asarray(imread(fname))
+        if arr.ndim == 3:
+            # luminance, as the former scipy.misc.imread(flatten=True)
+            arr = np.dot(arr[..., :3], [0.299, 0.587, 0.114])
+    arr = _slice_array(arr, slc)
+    if out is None:
+        return arr
+    out[...] = arr
+    return out
+
+
 class Hdf5MetadataReader:
 
-    def __init__(self, filePath, excludedSections=['exchange', 'defaults'], readOnOpen=True):
+    def __init__(self, filePath, excludedSections=['exchange', 'defaults'], readOnOpen=True,
+                 maxElements=10000):
         self.file = h5py.File(filePath, 'r')
         self.metadataDict = {}
         self.excludedSections = excludedSections
+        self.maxElements = maxElements
         if readOnOpen:
             self.readMetadata()
 
@@ -1269,43 +2819,14 @@ class Hdf5MetadataReader:
         return self.metadataDict
 
     def __readMetadata(self, name, obj):
-        if isinstance(obj, h5py.Dataset):
-            rootName = name.split('/')[0]
-            if rootName not in self.excludedSections:
-                try:
-                    # This is when the obj shape is (1,) (DESY, APS)
-                    if obj[()].shape[0] == 1:
-                        value = obj[()][0]
-                        if isinstance(value, bytes):
-                            value = value.decode("utf-8")
-                        elif  (value.dtype.kind == 'S'):
-                            value = value.decode(encoding="utf-8")
-                            # print("0>>>>>>>>>>>> %s: %s" % (obj.name, value))
-                        attr = obj.attrs.get('units')
-                        if attr != None:
-                            attr = attr.decode('UTF-8')
-                            # print("1>>>>>> %s: %s %s" % (obj.name, value, attr))
-                        self.metadataDict.update( {obj.name : [value, attr] } )
-                except AttributeError: # This is when the obj is byte so has no attribute 'shape'
-                    value = obj[()] 
-                    if isinstance(value, bytes):
-                        value = value.decode("utf-8")
-                    attr = obj.attrs.get('units')
-                    if attr != None:
-                        attr = attr.decode('UTF-8')
-                    self.metadataDict.update( {obj.name : [value, attr] } )
-                    # print("2>>>>>> %s: %s %s" % (obj.name, value, attr))
-                except IndexError: # This is when the obj shape is () (ESRF and DLS) instead of (1,) (DESY, APS)
-                    attr = obj.attrs.get('units')
-                    if attr != None:
-                        if isinstance(attr, str): 
-                            pass
-                        else:
-                            attr = attr.decode('UTF-8')
-                    value = obj[()]
-                    # print("3>>>>>> %s: %s %s" % (obj.name, value, attr))
-                    self.metadataDict.update( {obj.name : [value, attr] } )
-    
+        if not isinstance(obj, h5py.Dataset):
+            return
+        if name.split('/')[0] in self.excludedSections:
+            return
+        item = _read_meta_item(obj, self.maxElements)
+        if item is not None:
+            self.metadataDict[obj.name] = item
+
     def close(self):
         if self.file:
             self.file.close()
@@ -56,6 +56,8 @@ import os
 import h5py
 import logging
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from itertools import cycle
 
 __author__ = "Doga Gursoy, Francesco De Carlo"
@@ -257,6 +259,10 @@ def write_hdf5(
     else:
         maxshape = maxsize
     fname, data = _init_write(data, fname, ".h5", dtype, overwrite)
+    # close the read-only handle the readers may keep open on this file
+    from dxchange.reader import clear_hdf5_cache
+
+    clear_hdf5_cache(fname)
 
     with h5py.File(fname, mode=mode) as f:
         if "implements" not in f:
@@ -315,6 +321,9 @@ def write_dxf(data, fname="tmp/data.h5", axes="theta:y:x", dtype=None, overwrite
         if True, overwrites the existing file if the file exists.
     """
     fname, data = _init_write(data, fname, ".h5", dtype, overwrite)
+    from dxchange.reader import clear_hdf5_cache
+
+    clear_hdf5_cache(fname)
     f = dxfile.dxtomo.File(fname, mode="w")
     f.add_entry(
         dxfile.dxtomo.Entry.data(
@@ -345,7 +354,17 @@ def write_npy(data, fname="tmp/data.npy", dtype=None, overwrite=False):
     np.save(fname, data)
 
 
-def write_tiff(data, fname="tmp/data.tiff", dtype=None, overwrite=False):
+def write_tiff(
+    data,
+    fname="tmp/data.tiff",
+    dtype=None,
+    overwrite=False,
+    compression=None,
+    level=None,
+    tile=None,
+    bigtiff=None,
+    workers=None,
+):
     """
     Write image data to a tiff file.
 
@@ -360,15 +379,61 @@ def write_tiff(data, fname="tmp/data.tiff", dtype=None, overwrite=False):
         By default, the data-type is inferred from the input data.
     overwrite: bool, optional
         if True, overwrites the existing file if the file exists.
+    compression : str, optional
+        Compression scheme, e.g. 'zlib', 'zstd' or 'lzw'. Schemes other
+        than 'zlib' require the imagecodecs package.
+    level : int, optional
+        Compression level.
+    tile : tuple of int, optional
+        Shape (rows, columns) of the tiles. By default the image is
+        written in strips.
+    bigtiff : bool, optional
+        Write a BigTIFF file. By default only done for data too large for
+        a classic tiff file.
+    workers : int, optional
+        Number of threads compressing the strips or tiles.
     """
     fname, data = _init_write(data, fname, ".tiff", dtype, overwrite)
     import tifffile
 
-    tifffile.imwrite(fname, data)
+    options = _tiff_options(compression, level, tile, workers)
+    if bigtiff is not None:
+        options["bigtiff"] = bigtiff
+    tifffile.imwrite(fname, data, **options)
+
+
+def _tiff_options(compression, level, tile, workers):
+    """
+    Keyword arguments of tifffile for the compression and layout options.
+    """
+    options = {}
+    if compression is not None:
+        options["compression"] = compression
+        if level is not None:
+            options["compressionargs"] = {"level": level}
+    if tile is not None:
+        options["tile"] = tile
+    if workers is not None:
+        options["maxworkers"] = workers
+    return options
 
 
 def write_tiff_stack(
-    data, fname="tmp/data.tiff", dtype=None, axis=0, digit=5, start=0, overwrite=False
+    data,
+    fname="tmp/data.tiff",
+    dtype=None,
+    axis=0,
+    digit=5,
+    start=0,
+    overwrite=False,
+    background=False,
+    workers=None,
+    queue_size=None,
+    compression=None,
+    level=None,
+    tile=None,
+    single_file=False,
+    bigtiff=None,
 ):
     """
     Write data to stack of tiff file.
@@ -390,16 +455,195 @@ def write_tiff_stack(
         Number of digits in indexing stacked files.
     overwrite: bool, optional
         if True, overwrites the existing file if the file exists.
+    background : bool, optional
+        If True, queue the slices to a thread pool shared by the background
+        writes and return once they are all queued. The call blocks while
+        queue_size slices are waiting to be written, so that a caller
+        producing data faster than it is written is slowed down. The data
+        must not be modified until the returned future is done.
+    workers : int, optional
+        Number of threads writing the files in background mode, or
+        compressing the strips or tiles of each image otherwise.
+    queue_size : int, optional
+        Maximum number of slices, or of single files, queued or being
+        written in background mode. Defaults to twice the number of
+        threads.
+    compression : str, optional
+        Compression scheme, e.g. 'zlib', 'zstd' or 'lzw'. Schemes other
+        than 'zlib' require the imagecodecs package.
+    level : int, optional
+        Compression level.
+    tile : tuple of int, optional
+        Shape (rows, columns) of the tiles. By default the images are
+        written in strips.
+    single_file : bool, optional
+        If True, write all slices as the pages of the single file fname
+        instead of one file per slice.
+    bigtiff : bool, optional
+        Write BigTIFF files. By default only done for data too large for
+        a classic tiff file.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Only in background mode. Its result is the list of written file
+        names, or the first error raised while writing.
     """
-    fname, data = _init_write(data, fname, ".tiff", dtype, True)
+    fname, data = _init_write(data, fname, ".tiff", dtype, overwrite or not single_file)
+    _data = np.swapaxes(data, 0, axis)
+
+    if single_file:
+        options = _tiff_options(compression, level, tile,
+                                None if background else workers)
+        if bigtiff is None:
+            bigtiff = data.nbytes > 2**32 - 2**25
+        if not background:
+            _write_tiff_pages(_data, fname, bigtiff, options)
+            return
+        return _background_writer(workers, queue_size).submit(
+            _write_tiff_file, _data, fname, bigtiff, options)
+
+    options = dict(compression=compression, level=level, tile=tile,
+                   bigtiff=bigtiff, workers=None if background else workers)
     body = get_body(fname)
     ext = get_extension(fname)
-    _data = np.swapaxes(data, 0, axis)
+    fnames = []
     for m in range(start, start + data.shape[axis]):
         _fname = body + "_" + "{0:0={1}d}".format(m, digit) + ext
         if not overwrite:
             _fname = _suggest_new_fname(_fname, digit=1)
-        write_tiff(_data[m - start], _fname, overwrite=overwrite)
+        fnames.append(_fname)
+
+    if not background:
+        for m, _data_m in enumerate(_iter_contiguous(_data)):
+            write_tiff(_data_m, fnames[m], overwrite=overwrite, **options)
+        return
+
+    return _write_tiff_slices(_background_writer(workers, queue_size),
+                              _data, fnames, overwrite, options)
+
+
+def _iter_contiguous(data, slab_bytes=2**26):
+    """
+    Yield the slices of data along axis 0 as contiguous arrays, copying
+    slabs of about slab_bytes when data is not contiguous.
+    """
+    if data.flags.c_contiguous or len(data) == 0:
+        for m in range(len(data)):
+            yield data[m]
+        return
+    slab = max(1, slab_bytes // max(1, data[0].nbytes))
+    for s0 in range(0, len(data), slab):
+        block = np.ascontiguousarray(data[s0:s0 + slab])
+        for m in range(len(block)):
+            yield block[m]
+
+
+def _write_tiff_pages(data, fname, bigtiff, options):
+    """
+    Write the slices of data along axis 0 as the pages of one tiff file.
+    """
+    import tifffile
+
+    with tifffile.TiffWriter(fname, bigtiff=bigtiff) as tif:
+        for page in _iter_contiguous(data):
+            tif.write(page, photometric="minisblack", metadata=None, **options)
+
+
+def _write_tiff_file(data, fname, bigtiff, options):
+    """
+    Write a single-file tiff stack, returning the list of file names.
+    """
+    _write_tiff_pages(data, fname, bigtiff, options)
+    return [fname]
+
+
+def _write_tiff_slices(background, data, fnames, overwrite, options):
+    """
+    Queue the slices of data to the background writer, and return a future
+    done once all are written or on the first error.
+    """
+    future = Future()
+    future.set_running_or_notify_cancel()
+    lock = threading.Lock()
+    pending = [len(fnames)]
+
+    def _done(f):
+        with lock:
+            pending[0] -= 1
+            if future.done():
+                return
+            if f.exception() is not None:
+                logger.error("Writing tiff stack failed: %s", f.exception())
+                future.set_exception(f.exception())
+            elif not pending[0]:
+                future.set_result(fnames)
+
+    if not fnames:
+        future.set_result(fnames)
+    try:
+        for m, _data_m in enumerate(_iter_contiguous(data)):
+            if future.done():
+                # stop queuing after an error
+                break
+            background.submit(
+                write_tiff, _data_m, fnames[m], overwrite=overwrite, **options
+            ).add_done_callback(_done)
+    except BaseException as e:
+        with lock:
+            if not future.done():
+                future.set_exception(e)
+        raise
+    return future
+
+
+class _BackgroundWriter(object):
+    """
+    Thread pool writing files in the background, with a bounded queue:
+    submit blocks the caller while queue_size tasks are queued or running.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="write_tiff_stack")
+        self._slots = threading.BoundedSemaphore(queue_size)
+
+    def submit(self, func, *args, **kwargs):
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        return future
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def _background_writer(workers=None, queue_size=None):
+    """
+    Return the background writer shared by the calls, replacing it when
+    the number of threads or the queue size change.
+    """
+    global _background
+    if queue_size is None:
+        queue_size = 2 * (workers or os.cpu_count() or 1)
+    with _background_lock:
+        if (_background is None or _background.workers != workers or
+                _background.queue_size != queue_size):
+            if _background is not None:
+                # queued writes of the previous writer still complete
+                _background.shutdown(wait=False)
+            _background = _BackgroundWriter(workers, queue_size)
+        return _background
 
 
 def write_vtr(data, fname="tmp/data.vtr", down_sampling=(5, 5, 5)):
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# #########################################################################
+# Copyright (c) 2015, UChicago Argonne, LLC. All rights reserved.         #
+#                                                                         #
+# Copyright 2015. UChicago Argonne, LLC. This software was produced       #
+# under U.S. Government contract DE-AC02-06CH11357 for Argonne National   #
+# Laboratory (ANL), which is operated by UChicago Argonne, LLC for the    #
+# U.S. Department of Energy. The U.S. Government has rights to use,       #
+# reproduce, and distribute this software.  NEITHER THE GOVERNMENT NOR    #
+# UChicago Argonne, LLC MAKES ANY WARRANTY, EXPRESS OR IMPLIED, OR        #
+# ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  If software is     #
+# modified to produce derivative works, such modified software should     #
+# be clearly marked, so as not to confuse it with the version available   #
+# from ANL.                                                               #
+#                                                                         #
+# Additionally, redistribution and use in source and binary forms, with   #
+# or without modification, are permitted provided that the following      #
+# conditions are met:                                                     #
+#                                                                         #
+#     * Redistributions of source code must retain the above copyright    #
+#       notice, this list of conditions and the following disclaimer.     #
+#                                                                         #
+#     * Redistributions in binary form must reproduce the above copyright #
+#       notice, this list of conditions and the following disclaimer in   #
+#       the documentation and/or other materials provided with the        #
+#       distribution.                                                     #
+#                                                                         #
+#     * Neither the name of UChicago Argonne, LLC, Argonne National       #
+#       Laboratory, ANL, the U.S. Government, nor the names of its        #
+#       contributors may be used to endorse or promote products derived   #
+#       from this software without specific prior written permission.     #
+#                                                                         #
+# THIS SOFTWARE IS PROVIDED BY UChicago Argonne, LLC AND CONTRIBUTORS     #
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT       #
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS       #
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL UChicago     #
+# Argonne, LLC OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,        #
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,    #
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;        #
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER        #
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT      #
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN       #
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE         #
+# POSSIBILITY OF SUCH DAMAGE.                                             #
+# #########################################################################
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+import h5py
+from dxchange import reader
+from dxchange.catalog import MetadataCatalog
+
+
+class metadata_catalog_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        for n, (energy, date) in enumerate(((25.0, '2023-05-01'), (25.0, '2022-01-10'),
+                                            (30.0, '2023-06-01'))):
+            self._write(os.path.join(self.tmpdir, 'run%d' % (n % 2), 'scan_%d.h5' % n),
+                        energy, date)
+        with open(os.path.join(self.tmpdir, 'notes.txt'), 'w') as f:
+            f.write('not a scan')
+        self.catalog = MetadataCatalog(os.path.join(self.tmpdir, 'catalog.db'))
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, fname, energy, date):
+        if not os.path.isdir(os.path.dirname(fname)):
+            os.makedirs(os.path.dirname(fname))
+        with h5py.File(fname, 'w') as f:
+            f['measurement/instrument/monochromator/energy'] = [energy]
+            f['measurement/instrument/monochromator/energy'].attrs['units'] = 'keV'
+            f['process/acquisition/end_date'] = [date.encode()]
+
+    def test_scan_and_query(self):
+        self.assertEqual(self.catalog.scan(self.tmpdir, workers=2), 3)
+        self.assertEqual(len(self.catalog), 3)
+        found = self.catalog.query(('energy', '==', 25), ('end_time', '>', '2023-01-01'))
+        self.assertEqual([os.path.basename(p) for p in found], ['scan_0.h5'])
+        self.assertEqual(len(self.catalog.query(('energy', '>=', 25))), 3)
+        meta = self.catalog.get(found[0])
+        self.assertEqual(meta['energy'], [25.0, 'keV'])
+        self.assertEqual(meta['/process/acquisition/end_date'], ['2023-05-01', None])
+        self.assertRaises(ValueError, self.catalog.query, ('energy', 'like', 25))
+
+    def test_incremental_scan(self):
+        self.catalog.scan(self.tmpdir, workers=1)
+        self.assertEqual(self.catalog.scan(self.tmpdir, workers=1), 0)
+        fname = os.path.join(self.tmpdir, 'run0', 'scan_0.h5')
+        time.sleep(0.01)
+        self._write(fname, 40.0, '2024-01-01')
+        os.remove(os.path.join(self.tmpdir, 'run1', 'scan_1.h5'))
+        self.assertEqual(self.catalog.scan(self.tmpdir, workers=1), 1)
+        self.assertEqual(len(self.catalog), 2)
+        self.assertEqual(self.catalog.query(('energy', '==', 40)), [fname])
+
+    def test_registered_layout_spawn(self):
+        reader.register_meta_layout(
+            'catalog_test', {'beam_energy': '/measurement/instrument/monochromator/energy'})
+        self.addCleanup(reader._meta_layouts.pop, 'catalog_test')
+        spawn = multiprocessing.get_context('spawn')
+        with MetadataCatalog(os.path.join(self.tmpdir, 'custom.db'),
+                             file_format='catalog_test') as catalog, \
+                mock.patch('multiprocessing.Pool', spawn.Pool):
+            self.assertEqual(catalog.scan(self.tmpdir, workers=2), 3)
+            self.assertEqual(len(catalog.query(('beam_energy', '>', 0))), 3)
+        self.assertRaises(ValueError, MetadataCatalog,
+                          os.path.join(self.tmpdir, 'none.db'), file_format='none')
@@ -49,8 +49,117 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-from numpy.testing.utils import assert_equal
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import multiprocessing
+import h5py
+import numpy as np
+from numpy.testing.utils import assert_allclose, assert_equal
 import dxchange
 
 #def test_read_aps_8bm():
 #    proj, flat = dxchange.read_aps_8bm('data_dir/', range(0, 200), range(0, 100), file_pattern="image_00000.xrm", sino=(0, 16))
+
+
+def _write_swmr_scan(fname, frames, written, resume):
+    with h5py.File(fname, 'w', libver='latest') as f:
+        f['process/acquisition/rotation/num_angles'] = [len(frames)]
+        data = f.create_dataset('exchange/data', shape=(0, ) + frames.shape[1:],
+                                maxshape=(None, ) + frames.shape[1:],
+                                chunks=(1, ) + frames.shape[1:], dtype=frames.dtype)
+        f.swmr_mode = True
+        for stop in (2, len(frames)):
+            start = data.shape[0]
+            data.resize(stop, axis=0)
+            data[start:stop] = frames[start:stop]
+            data.flush()
+            written.set()
+            resume.wait()
+            resume.clear()
+
+
+class read_aps_tomoscan_hdf5_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmpdir, 'scan.h5')
+        rng = np.random.RandomState(0)
+        self.tomo = rng.randint(200, 1000, (6, 4, 5)).astype(np.uint16)
+        self.flat = rng.randint(1000, 2000, (3, 4, 5)).astype(np.uint16)
+        self.dark = rng.randint(0, 100, (2, 4, 5)).astype(np.uint16)
+        with h5py.File(self.fname, 'w') as f:
+            f['exchange/data'] = self.tomo
+            f['exchange/data_white'] = self.flat
+            f['exchange/data_dark'] = self.dark
+            f['exchange/theta'] = np.linspace(0, 180, 6)
+
+    def tearDown(self):
+        dxchange.reader.clear_hdf5_cache()
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_aps_tomoscan_hdf5_normalize(self):
+        for method, reduce in ((True, np.mean), ('median', np.median)):
+            tomo, flat, dark, theta = dxchange.read_aps_tomoscan_hdf5(
+                self.fname, sino=(1, 3), normalize=method, minus_log=True)
+            _flat = reduce(self.flat[:, 1:3], axis=0)
+            _dark = reduce(self.dark[:, 1:3], axis=0)
+            expected = -np.log((self.tomo[:, 1:3] - _dark) / (_flat - _dark))
+            self.assertEqual(tomo.dtype, np.float32)
+            self.assertEqual(flat.shape, (1, 2, 5))
+            assert_allclose(tomo, expected, rtol=1e-5)
+            assert_allclose(theta, np.deg2rad(np.linspace(0, 180, 6)))
+        # the file is closed once read
+        with h5py.File(self.fname, 'a') as f:
+            f['exchange/theta'][0] = 0
+
+    def test_read_aps_tomoscan_hdf5_normalize_arguments(self):
+        for kwargs in ({'normalize': 'medain'}, {'normalize': 1},
+                       {'normalize': True, 'dtype': np.float64},
+                       {'normalize': 'mean', 'lazy': True}):
+            self.assertRaises(ValueError, dxchange.read_aps_tomoscan_hdf5,
+                              self.fname, **kwargs)
+        tomo, _, _, _ = dxchange.read_aps_tomoscan_hdf5(self.fname, normalize='mean')
+        self.assertEqual(tomo.dtype, np.float32)
+
+    def test_read_aps_tomoscan_hdf5_normalize_workers(self):
+        expected, _, _, _ = dxchange.read_aps_tomoscan_hdf5(self.fname, normalize=True)
+        pool = multiprocessing.Pool
+        with mock.patch('multiprocessing.Pool', side_effect=pool) as pools:
+            tomo, flat, dark, theta = dxchange.read_aps_tomoscan_hdf5(
+                self.fname, normalize=True, workers=2)
+        self.assertEqual(pools.call_count, 1)
+        assert_allclose(tomo, expected, rtol=1e-6)
+
+    def test_read_sesame_beats_opens_once(self):
+        with mock.patch('h5py.File', side_effect=h5py.File) as opens:
+            tomo, flat, dark, theta = dxchange.read_sesame_beats(self.fname, proj=(1, 4))
+        self.assertEqual(opens.call_count, 1)
+        assert_equal(tomo, self.tomo[1:4])
+        assert_allclose(theta, np.deg2rad(np.linspace(0, 180, 6)[1:4]))
+        self.assertEqual(len(dxchange.reader._hdf5_files), 0)
+
+    def test_tail_aps_tomoscan_hdf5(self):
+        fname = os.path.join(self.tmpdir, 'live.h5')
+        written, resume = multiprocessing.Event(), multiprocessing.Event()
+        writer = multiprocessing.Process(target=_write_swmr_scan,
+                                         args=(fname, self.tomo, written, resume))
+        writer.start()
+        try:
+            self.assertTrue(written.wait(10))
+            written.clear()
+            tail = dxchange.tail_aps_tomoscan_hdf5(fname, sino=(1, 3), interval=0.01)
+            ind, tomo = next(tail)
+            self.assertEqual(ind, range(0, 2))
+            assert_equal(tomo, self.tomo[:2, 1:3])
+            resume.set()
+            self.assertTrue(written.wait(10))
+            ind, tomo = next(tail)
+            self.assertEqual(ind, range(2, 6))
+            assert_equal(tomo, self.tomo[2:, 1:3])
+            # all num_angles projections are read
+            self.assertRaises(StopIteration, next, tail)
+        finally:
+            resume.set()
+            writer.join(10)
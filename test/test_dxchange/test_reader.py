@@ -50,10 +50,17 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import unittest
+from unittest import mock
 from dxchange import reader
+from dxchange import writer
+from dxchange import dtype
+import h5py
 import numpy as np
 from numpy.testing.utils import assert_equal
 import os
+import shutil
+import tempfile
+import tifffile
 
 TEST_DIR = os.path.dirname(os.path.dirname(__file__))
 
@@ -382,3 +389,529 @@ class read_tiff_files_test_case(unittest.TestCase):
         np.testing.utils.assert_equal(array_data[0], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
         np.testing.utils.assert_equal(array_data[2, 3], 3)
         np.testing.utils.assert_equal(array_data[5:7, 6:8], [[7, 8], [7, 8]])
+
+    def test_read_tiff_stack_workers(self):
+        fname = os.path.join(TEST_DIR, "test_data/reader_00000.tiff")
+        serial = reader.read_tiff_stack(fname, ind=range(4), workers=1)
+        threaded = reader.read_tiff_stack(fname, ind=range(4), workers=4)
+
+        self.assertEqual(serial.shape, (4, 8, 16))
+        for m in range(4):
+            np.testing.utils.assert_equal(
+                serial[m], reader.read_tiff(
+                    os.path.join(TEST_DIR, "test_data/reader_0000%d.tiff" % m)))
+        np.testing.utils.assert_equal(threaded, serial)
+
+    def test_iter_tiff_stack(self):
+        fname = os.path.join(TEST_DIR, "test_data/reader_00000.tiff")
+        expected = reader.read_tiff_stack(fname, ind=range(4), slc=((2, 6), None))
+        for prefetch in (0, 2):
+            blocks = list(reader.iter_tiff_stack(
+                fname, range(4), chunk=3, prefetch=prefetch, slc=((2, 6), None)))
+            self.assertEqual([ind for ind, _ in blocks], [[0, 1, 2], [3]])
+            np.testing.utils.assert_equal(
+                np.concatenate([arr for _, arr in blocks]), expected)
+
+    def test_read_tiff_stack_out(self):
+        fname = os.path.join(TEST_DIR, "test_data/reader_00000.tiff")
+        expected = reader.read_tiff_stack(fname, ind=range(4), slc=((2, 6), None))
+        out = np.empty((4, 4, 16), dtype=expected.dtype)
+        arr = reader.read_tiff_stack(fname, ind=range(4), slc=((2, 6), None), out=out)
+        self.assertIs(arr, out)
+        np.testing.utils.assert_equal(out, expected)
+
+    def test_read_tiff_stack_shared(self):
+        fname = os.path.join(TEST_DIR, "test_data/reader_00000.tiff")
+        arr = reader.read_tiff_stack(fname, ind=range(4), shared=True)
+        self.assertTrue(dtype.is_sharedmem(arr))
+        np.testing.utils.assert_equal(arr, reader.read_tiff_stack(fname, ind=range(4)))
+
+
+class read_compressed_tiff_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.data = (np.arange(100 * 70) % 251).reshape(100, 70).astype(np.uint16)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, **kwargs):
+        fname = os.path.join(self.tmpdir, name)
+        tifffile.imwrite(fname, self.data, compression='zlib', **kwargs)
+        return fname
+
+    def test_read_tiff_slice_strips(self):
+        fname = self._write('strips.tiff', rowsperstrip=16)
+        for slc in [((20, 40), None), ((5, 90, 7), (3, 60, 2)), ((50, 10, -3), )]:
+            assert_equal(reader.read_tiff(fname, slc=slc),
+                         reader._slice_array(self.data, slc))
+
+    def test_read_tiff_slice_into_out(self):
+        fname = self._write('strips.tiff', rowsperstrip=16)
+        out = np.empty((20, 70), dtype=np.uint16)
+        arr = reader.read_tiff(fname, slc=((20, 40), None), out=out)
+        self.assertIs(arr, out)
+        assert_equal(out, self.data[20:40])
+
+    def test_read_tiff_slice_tiles(self):
+        fname = self._write('tiles.tiff', tile=(32, 32))
+        for slc in [((20, 40), None), ((33, 99, 5), (40, 70)), ((0, 1), (69, 0, -4))]:
+            assert_equal(reader.read_tiff(fname, slc=slc),
+                         reader._slice_array(self.data, slc))
+
+    def test_read_tiff_slice_pages(self):
+        fname = os.path.join(self.tmpdir, 'pages.tiff')
+        data = self.data[:30].reshape(3, 10, 70)
+        tifffile.imwrite(fname, data, compression='zlib', photometric='minisblack')
+        slc = ((0, 2), (2, 5))
+        arr = reader.read_tiff(fname, slc=slc)
+        self.assertEqual(arr.shape, (2, 3, 70))
+        assert_equal(arr, reader._slice_array(data, slc))
+
+
+class read_filtered_tiff_stack_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        rng = np.random.RandomState(0)
+        self.data = rng.randint(0, 1000, (5, 40, 30))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, dtype):
+        for m, frame in enumerate(self.data):
+            tifffile.imwrite(os.path.join(self.tmpdir, "proj_%05d.tiff" % m),
+                             frame.astype(dtype))
+        return os.path.join(self.tmpdir, "proj_00000.tiff")
+
+    def _per_file(self, fname, **kwargs):
+        return np.array([reader.read_tiff(f, **kwargs) for f in
+                         reader._list_file_stack(fname, range(5))])
+
+    def test_median_uint16(self):
+        fname = self._write(np.uint16)
+        for mblur in (3, 5):
+            for slc in (None, ((10, 20), (5, 25, 2))):
+                kwargs = dict(slc=slc, mblur=mblur)
+                assert_equal(reader.read_tiff_stack(fname, range(5), **kwargs),
+                             self._per_file(fname, **kwargs))
+
+    def test_rotation_float32(self):
+        fname = self._write(np.float32)
+        for kwargs in (dict(angle=30), dict(angle=-12.5, mblur=3, slc=((10, 20), (5, 25, 2)))):
+            np.testing.assert_allclose(
+                reader.read_tiff_stack(fname, range(5), **kwargs),
+                self._per_file(fname, **kwargs), rtol=1e-5, atol=1e-2)
+
+
+class read_tiff_pages_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.data = np.arange(6 * 20 * 30, dtype=np.uint16).reshape(6, 20, 30)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, **kwargs):
+        fname = os.path.join(self.tmpdir, name)
+        tifffile.imwrite(fname, self.data, bigtiff=True, **kwargs)
+        return fname
+
+    def test_read_tiff_pages(self):
+        for kwargs in ({}, {'compression': 'zlib', 'rowsperstrip': 4}):
+            fname = self._write('scan.tiff', **kwargs)
+            assert_equal(reader.read_tiff_pages(fname), self.data)
+            assert_equal(
+                reader.read_tiff_pages(fname, ind=[4, 1, 2], slc=((3, 17, 2), (5, 0, -1)), workers=2),
+                self.data[[4, 1, 2], 3:17:2, 5:0:-1])
+
+    def test_read_tiff_pages_mmap(self):
+        fname = self._write('scan.tiff')
+        arr = reader.read_tiff_pages(fname, ind=range(1, 6, 2), slc=((2, 8), None), mmap=True)
+        self.assertFalse(arr.flags.owndata)
+        assert_equal(arr, self.data[1:6:2, 2:8])
+
+
+class read_indexed_tiff_stack_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.data = np.arange(5 * 12 * 10, dtype=np.uint16).reshape(5, 12, 10)
+        for m, frame in enumerate(self.data):
+            # one file with a different header falls back to the full parser
+            description = 'odd file' if m == 3 else None
+            tifffile.imwrite(os.path.join(self.tmpdir, "proj_%05d.tiff" % m),
+                             frame, byteorder='>', description=description)
+        self.fname = os.path.join(self.tmpdir, "proj_00000.tiff")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_tiff_stack_indexed(self):
+        for slc in (None, ((2, 9), None), ((10, 1, -3), (1, 8, 2))):
+            assert_equal(reader.read_tiff_stack(self.fname, range(5), slc=slc),
+                         self.data[(slice(None), ) + reader._make_slice_object_a_tuple(slc or ())])
+        layout = reader._tiff_stack_layout(self.fname)
+        self.assertEqual(layout.shape, (12, 10))
+        self.assertIsNone(reader._read_tiff_indexed(
+            layout, os.path.join(self.tmpdir, "proj_00003.tiff"), None,
+            np.empty((12, 10), np.uint16)))
+
+    def test_read_tiff_stack_transposed_frame(self):
+        # same file size and tag layout, different geometry
+        fname = os.path.join(self.tmpdir, "frame_00000.tiff")
+        tifffile.imwrite(fname, self.data[0, :8, :8].reshape(16, 4))
+        tifffile.imwrite(os.path.join(self.tmpdir, "frame_00001.tiff"),
+                         self.data[1, :8, :8].reshape(4, 16))
+        layout = reader._tiff_stack_layout(fname)
+        self.assertIsNone(reader._read_tiff_indexed(
+            layout, os.path.join(self.tmpdir, "frame_00001.tiff"), None,
+            np.empty((16, 4), np.uint16)))
+        self.assertRaises(ValueError, reader.read_tiff_stack, fname, range(2))
+
+
+class read_file_list_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.data = np.arange(4 * 8 * 6, dtype=np.uint16).reshape(4, 8, 6)
+        self.files = []
+        for m, frame in enumerate(self.data):
+            fname = os.path.join(self.tmpdir, "frame_%d" % m)
+            if m % 2:
+                # numpy file without extension, detected from its signature
+                with open(fname, 'wb') as f:
+                    np.save(f, frame)
+            else:
+                fname += '.tif'
+                tifffile.imwrite(fname, frame)
+            self.files.append(fname)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_file_list(self):
+        assert_equal(reader.read_file_list(self.files), self.data)
+        slc = ((1, 7, 2), (5, 0, -1))
+        assert_equal(reader.read_file_list(self.files, slc=slc, workers=2),
+                     self.data[:, 1:7:2, 5:0:-1])
+
+    def test_read_file_list_out(self):
+        out = dtype.empty_shared_array((4, 8, 6), np.float32)
+        self.assertIs(reader.read_file_list(self.files, out=out), out)
+        assert_equal(out, self.data)
+        self.assertRaises(ValueError, reader.read_file_list, self.files,
+                          out=np.empty((4, 6, 6)))
+
+
+class hdf5_cache_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmpdir, 'scan.h5')
+        self.data = np.arange(4 * 5 * 6, dtype=np.float32).reshape(4, 5, 6)
+        writer.write_hdf5(self.data, self.fname, overwrite=True)
+
+    def tearDown(self):
+        reader.clear_hdf5_cache()
+        reader.set_hdf5_cache_size(0)
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_hdf5_reuses_handle(self):
+        reader.set_hdf5_cache_size(8)
+        assert_equal(reader.read_hdf5(self.fname, 'exchange/data'), self.data)
+        handle = reader._hdf5_files[os.path.abspath(self.fname)]
+        assert_equal(reader.read_hdf5(self.fname, 'exchange/data', slc=((1, 3), None)),
+                     self.data[1:3])
+        self.assertIs(reader._hdf5_files[os.path.abspath(self.fname)], handle)
+        self.assertTrue(handle.file.id.valid)
+
+        # rewriting the file evicts the handle and the new data is read back
+        writer.write_hdf5(self.data + 1, self.fname, overwrite=True)
+        self.assertFalse(handle.file.id.valid)
+        assert_equal(reader.read_hdf5(self.fname, 'exchange/data'), self.data + 1)
+
+    def test_hdf5_cache_size(self):
+        reader.set_hdf5_cache_size(8)
+        reader.read_hdf5(self.fname, 'exchange/data')
+        handle = reader._hdf5_files[os.path.abspath(self.fname)]
+        reader.set_hdf5_cache_size(0)
+        self.assertFalse(handle.file.id.valid)
+        assert_equal(reader.read_hdf5(self.fname, 'exchange/data'), self.data)
+        self.assertEqual(len(reader._hdf5_files), 0)
+
+    def test_hdf5_cache_scope(self):
+        # files are not kept open by default, they can be rewritten with h5py
+        assert_equal(reader.read_hdf5(self.fname, 'exchange/data'), self.data)
+        with h5py.File(self.fname, 'a') as f:
+            f['exchange/data'][0] = 0
+        with h5py.File(self.fname, 'w'):
+            pass
+
+        writer.write_hdf5(self.data, self.fname, overwrite=True)
+        with reader.hdf5_cache():
+            reader.read_hdf5(self.fname, 'exchange/data')
+            handle = reader._hdf5_files[os.path.abspath(self.fname)]
+            reader.read_hdf5(self.fname, 'exchange/data')
+            self.assertIs(reader._hdf5_files[os.path.abspath(self.fname)], handle)
+        self.assertFalse(handle.file.id.valid)
+        self.assertEqual(len(reader._hdf5_files), 0)
+        with h5py.File(self.fname, 'a'):
+            pass
+
+    def test_hdf5_cache_threads(self):
+        import threading
+        entered = [threading.Event(), threading.Event()]
+        release = [threading.Event(), threading.Event()]
+
+        def block(m):
+            with reader.hdf5_cache():
+                reader.read_hdf5(self.fname, 'exchange/data')
+                entered[m].set()
+                release[m].wait(10)
+
+        threads = [threading.Thread(target=block, args=(m, )) for m in range(2)]
+        # A enters, B enters, A exits, B exits
+        threads[0].start()
+        self.assertTrue(entered[0].wait(10))
+        threads[1].start()
+        self.assertTrue(entered[1].wait(10))
+        release[0].set()
+        threads[0].join()
+        self.assertEqual(reader._hdf5_cache_limit(), 8)
+        release[1].set()
+        threads[1].join()
+        self.assertEqual(reader._hdf5_cache_limit(), 0)
+        self.assertEqual(len(reader._hdf5_files), 0)
+        reader.read_hdf5(self.fname, 'exchange/data')
+        with h5py.File(self.fname, 'w'):
+            pass
+
+    def test_read_hdf5_chunked(self):
+        fname = os.path.join(self.tmpdir, 'chunked.h5')
+        data = np.arange(10 * 8 * 6, dtype=np.uint16).reshape(10, 8, 6)
+        with h5py.File(fname, 'w') as f:
+            f.create_dataset('data', data=data, chunks=(3, 4, 6),
+                             compression='gzip')
+        for slc in (None, ((1, 10, 3), (2, 7)), ((2, 8, 2), None, (0, 6, 4))):
+            assert_equal(reader.read_hdf5(fname, 'data', slc=slc, dtype=np.float32),
+                         data[reader._make_slice_object_a_tuple(slc or ())])
+        with h5py.File(fname, 'r') as f:
+            plan, nchunks, nbytes = reader._hdf5_read_plan(f['data'], ((4, 7), (0, 3)))
+        self.assertEqual(len(plan), 1)
+        self.assertEqual(nchunks, 2)
+        self.assertEqual(nbytes, 2 * 3 * 4 * 6 * 2)
+
+    def test_read_hdf5_workers(self):
+        fname = os.path.join(self.tmpdir, 'chunked.h5')
+        data = np.arange(10 * 8 * 6, dtype=np.uint16).reshape(10, 8, 6)
+        with h5py.File(fname, 'w') as f:
+            f.create_dataset('data', data=data, chunks=(1, 8, 6),
+                             compression='gzip')
+        arr = reader.read_hdf5(fname, 'data', slc=((1, 9), (2, 5)), workers=2)
+        self.assertTrue(dtype.is_sharedmem(arr))
+        assert_equal(arr, data[1:9, 2:5])
+        assert_equal(reader.read_hdf5(self.fname, 'exchange/data', workers=3),
+                     self.data)
+
+    def test_read_hdf5_lazy(self):
+        arr = reader.read_hdf5(self.fname, 'exchange/data', slc=((1, 4), None, (5, 0, -2)),
+                               lazy=True)
+        expected = self.data[1:4, :, 5:0:-2]
+        self.assertIsInstance(arr, reader.Hdf5Array)
+        self.assertEqual((arr.shape, arr.dtype, len(arr)), (expected.shape, expected.dtype, 3))
+        assert_equal(np.asarray(arr), expected)
+        for key in (1, (slice(None), 2), (Ellipsis, slice(None, None, -1)),
+                    (-1, slice(4, 0, -3), 0), (slice(2, 2), )):
+            assert_equal(arr[key], expected[key])
+        self.assertRaises(IndexError, arr.__getitem__, (0, 0, 0, 0))
+        self.assertIsNone(reader.read_hdf5(self.fname, 'exchange/none', lazy=True))
+        # reads smaller than one piece do not start a process pool
+        arr = reader.read_hdf5(self.fname, 'exchange/data', lazy=True, workers=2)
+        with mock.patch('multiprocessing.Pool') as pool:
+            assert_equal(arr[1:3], self.data[1:3])
+        pool.assert_not_called()
+
+
+class read_hdf_meta_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmpdir, 'meta.h5')
+        with h5py.File(self.fname, 'w') as f:
+            f['measurement/energy'] = [25.0]
+            f['measurement/energy'].attrs['units'] = b'keV'
+            f['measurement/sample'] = np.array([b'foam'])
+            f['measurement/distance'] = 10.5
+            f['measurement/distance'].attrs['units'] = 'mm'
+            f['measurement/comment'] = b'test'
+            f['measurement/frame'] = np.zeros((1, 50, 50))
+            f['measurement/trace'] = np.arange(5)
+            f['exchange/data'] = np.zeros((1, 2))
+
+    def tearDown(self):
+        reader.clear_hdf5_cache()
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_hdf_meta(self):
+        meta = reader.read_hdf_meta(self.fname, max_elements=100)
+        self.assertEqual(meta['/measurement/energy'], [25.0, 'keV'])
+        self.assertEqual(meta['/measurement/sample'], ['foam', None])
+        self.assertEqual(meta['/measurement/distance'], [10.5, 'mm'])
+        self.assertEqual(meta['/measurement/comment'], ['test', None])
+        self.assertEqual(meta['/measurement/frame'],
+                         ['<float64 array of shape (1, 50, 50)>', None])
+        self.assertNotIn('/measurement/trace', meta)
+        self.assertNotIn('/exchange/data', meta)
+        meta = reader.read_hdf_meta(self.fname, max_elements=None)
+        assert_equal(meta['/measurement/frame'][0], np.zeros((50, 50)))
+
+    def test_create_standard_meta(self):
+        self.assertEqual(
+            reader.read_hdf_meta_paths(self.fname, ['/measurement/energy', '/measurement/trace',
+                                                    '/measurement/none']),
+            {'/measurement/energy': [25.0, 'keV']})
+        reader.register_meta_layout('test', {'energy': '/measurement/energy',
+                                             'sample_detector_distance': '/measurement/distance'})
+        try:
+            meta = reader.create_standard_meta(self.fname, 'test')
+        finally:
+            del reader._meta_layouts['test']
+        self.assertEqual(meta, {'energy': [25.0, 'keV'],
+                                'sample_detector_distance': [10.5, 'mm']})
+
+
+class read_hdf5_stack_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmpdir, 'scan.h5')
+        self.data = np.arange(5 * 6 * 4, dtype=np.uint16).reshape(5, 6, 4)
+        with h5py.File(self.fname, 'w') as f:
+            group = f.create_group('scan')
+            for m, frame in enumerate(self.data):
+                group.create_dataset('scan_0000_%04d.tif' % m, data=frame[np.newaxis],
+                                     compression='gzip')
+
+    def tearDown(self):
+        reader.clear_hdf5_cache()
+        shutil.rmtree(self.tmpdir)
+
+    def test_read_hdf5_stack(self):
+        with reader.find_dataset_group(self.fname) as group:
+            for workers in (None, 2):
+                arr = reader.read_hdf5_stack(group, 'scan_0000_0000.tif', [4, 0, 2],
+                                             slc=(None, (1, 5)), workers=workers)
+                assert_equal(arr, self.data[[4, 0, 2], 1:5])
+            out = dtype.empty_shared_array((5, 6, 4), np.float32)
+            reader.read_hdf5_stack(group, 'scan_0000_0000.tif', range(5), out=out[:, :, :],
+                                   workers=2)
+            assert_equal(out, self.data)
+
+    def test_read_hdf5_batch_opens_once(self):
+        out = dtype.empty_shared_array((5, 6, 4), np.uint16)
+        plan = [('/scan/scan_0000_%04d.tif' % m, None, np.s_[m:m + 1]) for m in range(5)]
+        with mock.patch('h5py.File', side_effect=h5py.File) as opens:
+            reader._init_hdf5_worker(out.base, 0, out.shape, out.strides, out.dtype,
+                                     self.fname)
+            reader._read_hdf5_batch(plan[:3])
+            reader._read_hdf5_batch(plan[3:])
+        self.assertEqual(opens.call_count, 1)
+        reader._hdf5_worker[1].close()
+        reader._hdf5_worker = None
+        assert_equal(out, self.data)
+
+    def test_als_group_index(self):
+        with h5py.File(self.fname, 'a') as f:
+            for inner in range(3):
+                for outer in (0, 2, 4):
+                    f['scan'].create_dataset('scanbak_%04d_%04d.tif' % (inner, outer),
+                                             data=self.data[outer][np.newaxis] + inner)
+                f['scan'].create_dataset('scandrk_%04d_0004.tif' % inner,
+                                         data=self.data[:1] * 0 + inner)
+        with reader.find_dataset_group(self.fname) as group:
+            index = reader._als_group_index(group)
+            self.assertEqual(index['tomo'].shape, (5, 2))
+            self.assertEqual(sorted(index['bak'][:, 1]), [0, 0, 0, 2, 2, 2, 4, 4, 4])
+            self.assertIs(reader._als_group_index(group), index)
+            self.assertEqual(reader._count_proj(group, 'scanbak_0000.tif', 5, inter_bright=2), 2)
+            self.assertEqual(reader._count_proj(group, 'scandrk_0000.tif', 5), 3)
+            flat = reader.read_hdf5_stack(group, 'scanbak_0000.tif', [0, 2], out_ind=[4, 0])
+            assert_equal(flat, self.data[[0, 0, 4, 4]] + np.array([0, 2, 0, 2])[:, None, None])
+            # names are resolved from the index by their indices
+            self.assertEqual(reader._als_resolve_names(
+                group, ['scanbak_2_04.tif', 'scan_0_3.tif', 'other_0001.tif']),
+                ['scanbak_0002_0004.tif', 'scan_0000_0003.tif', 'other_0001.tif'])
+            self.assertRaises(KeyError, reader.read_hdf5_stack, group,
+                              'scanbak_0000.tif', [0, 2], out_ind=[4, 3])
+
+
+class read_ole_image_test_case(unittest.TestCase):
+    def test_read_ole_image_region(self):
+        import olefile
+        ole = olefile.OleFileIO(os.path.join(TEST_DIR, "test_data/test_chip00.xrm"))
+        try:
+            metadata = reader.read_ole_metadata(ole)
+            full = np.frombuffer(ole.openstream("ImageData1/Image1").read(),
+                                 reader._get_ole_data_type(metadata).newbyteorder('<'))
+            full = full.reshape(metadata["image_height"], metadata["image_width"])
+            for slc in (None, ((3, 7), ), ((5, 500, 9), (384, 512)), ((300, 2, -7), (1, 9))):
+                assert_equal(reader._read_ole_image(ole, "ImageData1/Image1", metadata, slc=slc),
+                             full[reader._make_slice_object_a_tuple(slc or ())])
+            runs = reader._ole_sector_runs(ole, "ImageData1/Image1", 4000, 4200)
+            self.assertEqual(sum(size for offset, size in runs), 200)
+        finally:
+            ole.close()
+
+    def test_read_xrm_stack_workers(self):
+        fname = os.path.join(TEST_DIR, "test_data/test_chip00.xrm")
+        slc = ((5, 500, 9), (384, 512))
+        serial, serial_meta = reader.read_xrm_stack(fname, [0, 1], slc=slc, workers=1)
+        threaded, threaded_meta = reader.read_xrm_stack(fname, [0, 1], slc=slc)
+        for m, index in enumerate([0, 1]):
+            image, metadata = reader.read_xrm(
+                os.path.join(TEST_DIR, "test_data/test_chip0%d.xrm" % index), slc)
+            assert_equal(serial[m], image)
+            self.assertEqual(serial_meta["x_positions"][m], metadata["x_positions"])
+        assert_equal(threaded, serial)
+        self.assertEqual(threaded_meta["thetas"], serial_meta["thetas"])
+
+    def test_read_txrm_workers(self):
+        import olefile
+        fname = os.path.join(TEST_DIR, "test_data/txrm_test_chip_tomo.txrm")
+        slc = ((1, 6, 2), (5, 200, 9), (128, 256))
+        serial, _ = reader.read_txrm(fname, slc, workers=1)
+        threaded, _ = reader.read_txrm(fname, slc, workers=4)
+        ole = olefile.OleFileIO(fname)
+        try:
+            metadata = reader.read_ole_metadata(ole)
+            for i, idx in enumerate(range(1, 6, 2)):
+                assert_equal(serial[i], reader._read_ole_image(
+                    ole, "ImageData1/Image%d" % (idx + 1), metadata, slc=slc[1:]))
+        finally:
+            ole.close()
+        assert_equal(threaded, serial)
+
+    def test_read_txrm_mmap(self):
+        fname = os.path.join(TEST_DIR, "test_data/txrm_test_chip_tomo.txrm")
+        slc = ((1, 6, 2), (5, 200, 9), (128, 256))
+        images, _ = reader.read_txrm(fname, slc, mmap=True)
+        data, _ = reader.read_txrm(fname, slc)
+        self.assertEqual(len(images), len(data))
+        for image, expected in zip(images, data):
+            self.assertIsInstance(image, np.memmap)
+            assert_equal(image, expected)
+
+    def test_map_ole_image_fragmented(self):
+        import olefile
+        fname = os.path.join(TEST_DIR, "test_data/txrm_test_chip_tomo.txrm")
+        ole = olefile.OleFileIO(fname)
+        try:
+            metadata = reader.read_ole_metadata(ole)
+            region = reader._ole_image_region(metadata)
+            expected = reader._read_ole_image(ole, "ImageData1/Image1", metadata)
+            (offset, size), = reader._ole_sector_runs(
+                ole, "ImageData1/Image1", 0, region[2])
+            half = size // 2
+            runs = [(offset, half), (offset + half, size - half)]
+            with mock.patch.object(reader, '_ole_sector_runs', return_value=runs):
+                image = reader._map_ole_image(ole, fname, "ImageData1/Image1", region)
+            self.assertNotIsInstance(image, np.memmap)
+            assert_equal(image, expected)
+        finally:
+            ole.close()
@@ -48,7 +48,14 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import os
+import shutil
+import tempfile
+import threading
 import unittest
+from unittest import mock
+import numpy as np
+import tifffile
 from numpy.testing.utils import assert_equal
 import dxchange.writer as writer
 
@@ -80,3 +87,74 @@ class remove_trailing_digits_test_case(unittest.TestCase):
         text, number_of_digits = writer.remove_trailing_digits("")
         assert_equal(text, "")
         assert_equal(number_of_digits, 0)
+
+
+class write_tiff_stack_test_case(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.data = np.arange(6 * 4 * 5, dtype=np.float32).reshape(6, 4, 5)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_write_tiff_stack_background(self):
+        fname = os.path.join(self.tmpdir, 'rec', 'recon.tiff')
+        future = writer.write_tiff_stack(self.data, fname, axis=1, start=3,
+                                         background=True, workers=2,
+                                         queue_size=1)
+        fnames = future.result()
+        self.assertEqual(len(fnames), 4)
+        for m, _fname in enumerate(fnames):
+            self.assertTrue(_fname.endswith('recon_%05d.tiff' % (m + 3)))
+            assert_equal(tifffile.imread(_fname), self.data[:, m])
+
+    def test_write_tiff_stack_background_queue(self):
+        fname = os.path.join(self.tmpdir, 'recon.tiff')
+        release = threading.Event()
+        write_tiff = writer.write_tiff
+
+        def _write_tiff(*args, **kwargs):
+            release.wait(10)
+            return write_tiff(*args, **kwargs)
+
+        returned = threading.Event()
+        with mock.patch.object(writer, 'write_tiff', _write_tiff):
+            caller = threading.Thread(target=lambda: (writer.write_tiff_stack(
+                self.data, fname, background=True, workers=1, queue_size=2),
+                returned.set()))
+            caller.start()
+            # the caller blocks while two slices are queued or being written
+            self.assertFalse(returned.wait(0.2))
+            release.set()
+            self.assertTrue(returned.wait(10))
+            caller.join()
+            future = writer.write_tiff_stack(self.data, fname, background=True,
+                                             workers=1, queue_size=2)
+            self.assertEqual(len(future.result()), 6)
+        self.assertIs(writer._background_writer(1, 2), writer._background_writer(1, 2))
+
+    def test_write_tiff_stack_background_error(self):
+        fname = os.path.join(self.tmpdir, 'recon.tiff')
+        future = writer.write_tiff_stack(np.empty((2, 3, 4), dtype=object),
+                                         fname, background=True)
+        self.assertIsNotNone(future.exception())
+
+    def test_write_tiff_stack_compressed(self):
+        fname = os.path.join(self.tmpdir, 'recon.tiff')
+        writer.write_tiff_stack(self.data, fname, axis=2, compression='zlib',
+                                level=3, tile=(16, 16))
+        for m in range(5):
+            _fname = os.path.join(self.tmpdir, 'recon_%05d.tiff' % m)
+            with tifffile.TiffFile(_fname) as tif:
+                self.assertEqual(tif.pages[0].compression, 8)
+                self.assertTrue(tif.pages[0].is_tiled)
+                assert_equal(tif.asarray(), self.data[:, :, m].T)
+
+    def test_write_tiff_stack_single_file(self):
+        fname = os.path.join(self.tmpdir, 'recon.tiff')
+        writer.write_tiff_stack(self.data, fname, axis=1, single_file=True,
+                                bigtiff=True, compression='zlib')
+        with tifffile.TiffFile(fname) as tif:
+            self.assertTrue(tif.is_bigtiff)
+            self.assertEqual(len(tif.pages), 4)
+            assert_equal(tif.asarray(), np.swapaxes(self.data, 0, 1))